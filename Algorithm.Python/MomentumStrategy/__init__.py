@@ -5,12 +5,14 @@ Cross-Sectional Momentum Strategy
 QuantConnect/Lean implementation of the X_Quant momentum strategy.
 
 Modules:
-- main.py: Core algorithm implementation
+- momentum_6m_solution.py / momentum_12m_solution.py: Standalone algorithm implementations
 - framework_algorithm.py: Algorithm Framework version
 - alpha_model.py: Momentum signal generation
+- kernels.py: Numba-compiled numeric kernels (alpha scoring, ranking, universe screens)
 - portfolio_model.py: Portfolio construction
 - risk_model.py: Risk management
 - universe_model.py: Universe selection
+- lean_data.py: .pkl price loading helpers
 """
 
 __version__ = "2.0.0"
@@ -8,7 +8,20 @@ Generates insights based on momentum ranking.
 
 from AlgorithmImports import *
 from datetime import timedelta
-from typing import List, Dict
+from typing import List, Dict, FrozenSet, Optional
+import numpy as np
+import pandas as pd
+
+from kernels import score_and_confidence, select_long_short
+
+# Excluded symbols (leveraged ETFs), built once at import
+_EXCLUDED_LEVERAGED_ETFS: FrozenSet[str] = frozenset({
+    'TQQQ', 'SQQQ', 'TECL', 'TECS', 'SOXL', 'SOXS', 'UPRO', 'SPXU',
+    'SPXL', 'SPXS', 'TNA', 'TZA', 'UDOW', 'SDOW', 'LABU', 'LABD',
+    'NUGT', 'DUST', 'FNGU', 'FNGD', 'VXX', 'UVXY', 'SVXY', 'VIXY',
+    'USO', 'UNG', 'GLD', 'SLV', 'QLD', 'QID', 'SSO', 'SDS',
+    'JNUG', 'JDST', 'FAS', 'FAZ', 'ERX', 'ERY'
+})
 
 
 class MomentumAlphaModel(AlphaModel):
@@ -40,23 +53,29 @@ class MomentumAlphaModel(AlphaModel):
         self.n_short = n_short
         self.resolution = resolution
 
-        # Momentum indicators by symbol
-        self.momentum_by_symbol: Dict[Symbol, MomentumPercent] = {}
+        # Excluded symbols (shared immutable set)
+        self.excluded_symbols = _EXCLUDED_LEVERAGED_ETFS
+
+        # Security reference and momentum indicator by symbol
+        self.tracked: Dict[Symbol, tuple[Security, MomentumPercent]] = {}
+
+        # Bars of history needed to warm up newly added indicators
+        self._warm_up_period = lookback_days + 1
+
+        # Parallel views of the tracked securities for vectorized scoring
+        self._symbol_list: List[Symbol] = []
+        self._indicator_list: List[MomentumPercent] = []
+        self._security_list: List[Security] = []
+        self._volatility_list: List[Optional[IndicatorBase]] = []
 
         # Insight duration
         self.insight_period = timedelta(days=1)
 
-        # Track last generation time
-        self.last_generation_time = None
+        # Source model name for insight attribution
+        self._model_name = f"MomentumAlpha_{self.lookback_days}d"
 
-        # Excluded symbols (leveraged ETFs)
-        self.excluded_symbols = {
-            'TQQQ', 'SQQQ', 'TECL', 'TECS', 'SOXL', 'SOXS', 'UPRO', 'SPXU',
-            'SPXL', 'SPXS', 'TNA', 'TZA', 'UDOW', 'SDOW', 'LABU', 'LABD',
-            'NUGT', 'DUST', 'FNGU', 'FNGD', 'VXX', 'UVXY', 'SVXY', 'VIXY',
-            'USO', 'UNG', 'GLD', 'SLV', 'QLD', 'QID', 'SSO', 'SDS',
-            'JNUG', 'JDST', 'FAS', 'FAZ', 'ERX', 'ERY'
-        }
+        # Track last generation date (proleptic ordinal, -1 = never)
+        self._last_generation_ordinal = -1
 
     def update(self, algorithm: QCAlgorithm, data: Slice) -> List[Insight]:
         """
@@ -69,126 +88,111 @@ class MomentumAlphaModel(AlphaModel):
         Returns:
             List of insights
         """
-        insights = []
-
         # Only generate once per day
-        if self.last_generation_time is not None:
-            if self.last_generation_time.date() == algorithm.time.date():
-                return insights
+        today = algorithm.time.toordinal()
+        if today == self._last_generation_ordinal:
+            return []
 
-        self.last_generation_time = algorithm.time
+        self._last_generation_ordinal = today
 
         # Calculate momentum scores
-        scores = self._calculate_momentum_scores(algorithm)
-
-        if len(scores) < (self.n_long + self.n_short):
-            algorithm.log(f"MomentumAlpha: Insufficient securities ({len(scores)})")
-            return insights
-
-        # Rank by momentum
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-
-        # Get long and short symbols
-        long_symbols = [x[0] for x in ranked[:self.n_long]]
-        short_symbols = [x[0] for x in ranked[-self.n_short:]]
-
-        # Generate long insights
-        for symbol in long_symbols:
-            momentum_score = scores[symbol]
-
-            insight = Insight.price(
-                symbol,
-                self.insight_period,
-                InsightDirection.UP,
-                magnitude=abs(momentum_score),
-                confidence=self._calculate_confidence(momentum_score, scores),
-                source_model=self.get_model_name()
+        symbols, momentum, volatilities = self._calculate_momentum_scores(algorithm)
+
+        if len(symbols) < (self.n_long + self.n_short):
+            algorithm.log(f"MomentumAlpha: Insufficient securities ({len(symbols)})")
+            return []
+
+        # Risk-adjust scores and derive confidences in one compiled pass
+        values, confidences = score_and_confidence(momentum, volatilities)
+
+        # Select top/bottom N by score without sorting the whole universe
+        # (long: highest first, short: weakest last, ties in universe order)
+        long_idx, short_idx = select_long_short(values, self.n_long, self.n_short)
+        long_idx = long_idx.tolist()
+        short_idx = short_idx.tolist()
+
+        model_name = self.get_model_name()
+
+        # Generate long and short insights in a single pass
+        selected = long_idx + short_idx
+        directions = [InsightDirection.UP] * len(long_idx) + [InsightDirection.DOWN] * len(short_idx)
+        magnitudes = np.abs(values[selected]).tolist()
+        selected_confidences = confidences[selected].tolist()
+
+        period = self.insight_period
+        insights = [
+            Insight.price(
+                symbols[i],
+                period,
+                direction,
+                magnitude=magnitude,
+                confidence=confidence,
+                source_model=model_name
             )
-            insights.append(insight)
-
-        # Generate short insights
-        for symbol in short_symbols:
-            momentum_score = scores[symbol]
-
-            insight = Insight.price(
-                symbol,
-                self.insight_period,
-                InsightDirection.DOWN,
-                magnitude=abs(momentum_score),
-                confidence=self._calculate_confidence(momentum_score, scores),
-                source_model=self.get_model_name()
+            for i, direction, magnitude, confidence in zip(
+                selected, directions, magnitudes, selected_confidences
             )
-            insights.append(insight)
+        ]
 
         # Log summary
         if insights:
             algorithm.log(f"MomentumAlpha: Generated {len(insights)} insights "
-                         f"(Long: {len(long_symbols)}, Short: {len(short_symbols)})")
+                         f"(Long: {len(long_idx)}, Short: {len(short_idx)})")
 
         return insights
 
-    def _calculate_momentum_scores(self, algorithm: QCAlgorithm) -> Dict[Symbol, float]:
-        """Calculate momentum scores for all tracked securities"""
-        scores = {}
-
-        for symbol, indicator in self.momentum_by_symbol.items():
-            # Skip if indicator not ready
-            if not indicator.is_ready:
-                continue
-
-            # Skip if not in securities
-            if symbol not in algorithm.securities:
-                continue
-
-            security = algorithm.securities[symbol]
-            if security.price <= 0:
-                continue
-
-            # Get momentum score
-            momentum = indicator.current.value
-
-            # Filter extreme values (potential data errors)
-            if abs(momentum) > 500:
-                continue
-
-            scores[symbol] = momentum
-
-        return scores
-
-    def _calculate_confidence(self, score: float, all_scores: Dict[Symbol, float]) -> float:
+    def _calculate_momentum_scores(
+        self,
+        algorithm: QCAlgorithm
+    ) -> tuple[List[Symbol], np.ndarray, np.ndarray]:
         """
-        Calculate confidence based on momentum strength
+        Calculate momentum scores for all tracked securities
 
         Args:
-            score: Momentum score for this symbol
-            all_scores: All momentum scores
+            algorithm: The algorithm instance
 
         Returns:
-            Confidence level (0-1)
+            Tuple of (scored symbols, raw momentum, volatility used to risk-adjust it)
         """
-        if not all_scores:
-            return 0.5
-
-        # Calculate z-score
-        values = list(all_scores.values())
-        mean = sum(values) / len(values)
-        std = (sum((v - mean) ** 2 for v in values) / len(values)) ** 0.5
-
-        if std == 0:
-            return 0.5
-
-        z_score = abs(score - mean) / std
+        n = len(self._symbol_list)
+        values = np.empty(n, dtype=np.float64)
+        prices = np.empty(n, dtype=np.float64)
+        volatilities = np.zeros(n, dtype=np.float64)
+        ready = np.empty(n, dtype=bool)
+
+        # Pull indicator values, prices and volatilities in a single pass
+        tracked = zip(self._indicator_list, self._security_list, self._volatility_list)
+        for i, (indicator, security, vol_indicator) in enumerate(tracked):
+            ready[i] = indicator.is_ready
+            values[i] = indicator.current.value
+            prices[i] = security.price
+            if vol_indicator is not None and vol_indicator.is_ready:
+                volatilities[i] = vol_indicator.current.value
+
+        # Skip unready indicators, unpriced securities and extreme values (potential data errors)
+        valid = ready & (prices > 0) & (np.abs(values) <= 500)
+
+        symbols = self._symbol_list
+        indices = np.flatnonzero(valid)
+        return [symbols[i] for i in indices.tolist()], values[indices], volatilities[indices]
+
+    def _get_volatility_indicator(self, symbol: Symbol) -> Optional[IndicatorBase]:
+        """
+        Volatility indicator used to risk-adjust a symbol's momentum score
 
-        # Convert to confidence (higher z-score = higher confidence)
-        # Cap between 0.3 and 0.9
-        confidence = min(0.9, max(0.3, 0.5 + z_score * 0.1))
+        Args:
+            symbol: Tracked symbol
 
-        return confidence
+        Returns:
+            Indicator whose value divides the momentum score, or None to leave it unadjusted
+        """
+        return None
 
     def on_securities_changed(self, algorithm: QCAlgorithm, changes: SecurityChanges):
         """Handle universe changes"""
 
         # Add momentum indicators for new securities
+        added_symbols = []
         for security in changes.added_securities:
             symbol = security.symbol
 
@@ -196,19 +200,58 @@ class MomentumAlphaModel(AlphaModel):
             if symbol.value in self.excluded_symbols:
                 continue
 
-            if symbol not in self.momentum_by_symbol:
-                indicator = algorithm.momc(symbol, self.lookback_days, self.resolution)
-                self.momentum_by_symbol[symbol] = indicator
+            if symbol not in self.tracked:
+                self._add_indicators(algorithm, security)
+                added_symbols.append(symbol)
+
+        # Warm up all new indicators from a single history request
+        if added_symbols:
+            self._warm_up_indicators(algorithm, added_symbols)
 
         # Remove indicators for removed securities
         for security in changes.removed_securities:
-            symbol = security.symbol
-            if symbol in self.momentum_by_symbol:
-                del self.momentum_by_symbol[symbol]
+            self._remove_indicators(security.symbol)
+
+        self._rebuild_tracked_lists()
+
+    def _add_indicators(self, algorithm: QCAlgorithm, security: Security):
+        """Create and register indicators for a newly added, non-excluded security"""
+        symbol = security.symbol
+        indicator = MomentumPercent(self.lookback_days)
+        algorithm.register_indicator(symbol, indicator, self.resolution)
+        self.tracked[symbol] = (security, indicator)
+
+    def _warm_up_indicators(self, algorithm: QCAlgorithm, symbols: List[Symbol]):
+        """Warm up indicators for newly added symbols from one batched history request"""
+        history = algorithm.history(symbols, self._warm_up_period, self.resolution)
+        if history.empty:
+            return
+
+        for ticker in history.index.levels[0]:
+            symbol = SymbolCache.get_symbol(ticker)
+            if symbol in self.tracked:
+                self._warm_up_symbol(symbol, history.loc[ticker])
+
+    def _warm_up_symbol(self, symbol: Symbol, bars: pd.DataFrame):
+        """Feed historical bars to a symbol's indicators"""
+        _, indicator = self.tracked[symbol]
+        for bar in bars.itertuples():
+            indicator.update(bar.Index, bar.close)
+
+    def _remove_indicators(self, symbol: Symbol):
+        """Drop all indicators tracked for a removed symbol"""
+        self.tracked.pop(symbol, None)
+
+    def _rebuild_tracked_lists(self):
+        """Refresh the parallel symbol/indicator/security lists used for scoring"""
+        self._symbol_list = list(self.tracked.keys())
+        self._security_list = [security for security, _ in self.tracked.values()]
+        self._indicator_list = [indicator for _, indicator in self.tracked.values()]
+        self._volatility_list = [self._get_volatility_indicator(s) for s in self._symbol_list]
 
     def get_model_name(self) -> str:
         """Get model name for insight attribution"""
-        return f"MomentumAlpha_{self.lookback_days}d"
+        return self._model_name
 
 
 class EnhancedMomentumAlphaModel(MomentumAlphaModel):
@@ -239,55 +282,41 @@ class EnhancedMomentumAlphaModel(MomentumAlphaModel):
         self.volatility_by_symbol: Dict[Symbol, StandardDeviation] = {}
         self.volume_sma_by_symbol: Dict[Symbol, SimpleMovingAverage] = {}
 
-    def _calculate_momentum_scores(self, algorithm: QCAlgorithm) -> Dict[Symbol, float]:
-        """Calculate volatility-adjusted momentum scores"""
-        raw_scores = super()._calculate_momentum_scores(algorithm)
+        self._warm_up_period = max(self._warm_up_period, volatility_lookback, volume_lookback)
 
-        # Adjust by volatility (risk-adjusted momentum)
-        adjusted_scores = {}
+        self._model_name = f"EnhancedMomentumAlpha_{self.lookback_days}d"
 
-        for symbol, momentum in raw_scores.items():
-            if symbol in self.volatility_by_symbol:
-                vol_indicator = self.volatility_by_symbol[symbol]
-                if vol_indicator.is_ready and vol_indicator.current.value > 0:
-                    # Sharpe-like ratio: momentum / volatility
-                    vol = vol_indicator.current.value
-                    adjusted_scores[symbol] = momentum / vol
-                else:
-                    adjusted_scores[symbol] = momentum
-            else:
-                adjusted_scores[symbol] = momentum
+    def _get_volatility_indicator(self, symbol: Symbol) -> Optional[IndicatorBase]:
+        """Volatility for risk-adjusted (Sharpe-like) momentum: momentum / volatility"""
+        return self.volatility_by_symbol.get(symbol)
 
-        return adjusted_scores
+    def _add_indicators(self, algorithm: QCAlgorithm, security: Security):
+        """Create and register momentum, volatility and volume indicators in a single pass"""
+        super()._add_indicators(algorithm, security)
+        symbol = security.symbol
 
-    def on_securities_changed(self, algorithm: QCAlgorithm, changes: SecurityChanges):
-        """Handle universe changes with additional indicators"""
-        super().on_securities_changed(algorithm, changes)
+        # Add volatility indicator
+        volatility = StandardDeviation(self.volatility_lookback)
+        algorithm.register_indicator(symbol, volatility, self.resolution)
+        self.volatility_by_symbol[symbol] = volatility
 
-        for security in changes.added_securities:
-            symbol = security.symbol
-
-            if symbol.value in self.excluded_symbols:
-                continue
+        # Add volume SMA
+        volume_sma = SimpleMovingAverage(self.volume_lookback)
+        algorithm.register_indicator(symbol, volume_sma, self.resolution, Field.VOLUME)
+        self.volume_sma_by_symbol[symbol] = volume_sma
 
-            # Add volatility indicator
-            if symbol not in self.volatility_by_symbol:
-                self.volatility_by_symbol[symbol] = algorithm.std(
-                    symbol, self.volatility_lookback, self.resolution
-                )
+    def _warm_up_symbol(self, symbol: Symbol, bars: pd.DataFrame):
+        """Feed historical bars to momentum, volatility and volume indicators"""
+        super()._warm_up_symbol(symbol, bars)
 
-            # Add volume SMA
-            if symbol not in self.volume_sma_by_symbol:
-                self.volume_sma_by_symbol[symbol] = algorithm.sma(
-                    symbol, self.volume_lookback, self.resolution, Field.VOLUME
-                )
+        volatility = self.volatility_by_symbol[symbol]
+        volume_sma = self.volume_sma_by_symbol[symbol]
+        for bar in bars.itertuples():
+            volatility.update(bar.Index, bar.close)
+            volume_sma.update(bar.Index, bar.volume)
 
-        for security in changes.removed_securities:
-            symbol = security.symbol
-            if symbol in self.volatility_by_symbol:
-                del self.volatility_by_symbol[symbol]
-            if symbol in self.volume_sma_by_symbol:
-                del self.volume_sma_by_symbol[symbol]
-
-    def get_model_name(self) -> str:
-        return f"EnhancedMomentumAlpha_{self.lookback_days}d"
+    def _remove_indicators(self, symbol: Symbol):
+        """Drop momentum, volatility and volume indicators in a single pass"""
+        super()._remove_indicators(symbol)
+        self.volatility_by_symbol.pop(symbol, None)
+        self.volume_sma_by_symbol.pop(symbol, None)
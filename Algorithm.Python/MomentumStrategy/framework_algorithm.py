@@ -60,12 +60,13 @@ class MomentumFrameworkAlgorithm(QCAlgorithm):
 
         # ==================== STRATEGY PARAMETERS ====================
 
-        # Can be modified for optimization (use instance attributes if set, otherwise defaults)
-        lookback_days = getattr(self, '_lookback_days', 126)
-        n_long = getattr(self, '_n_long', 5)
-        n_short = getattr(self, '_n_short', 5)
-        max_position_weight = getattr(self, '_max_position_weight', 0.12)
-        max_drawdown = getattr(self, '_max_drawdown', 0.10)
+        # Can be modified for optimization (algorithm parameters, otherwise defaults)
+        lookback_days = self.get_parameter("lookback_days", 126)
+        n_long = self.get_parameter("n_long", 5)
+        n_short = self.get_parameter("n_short", 5)
+        max_position_weight = self.get_parameter("max_position_weight", 0.12)
+        max_drawdown = self.get_parameter("max_drawdown", 0.10)
+        risk_log_enabled = bool(self.get_parameter("risk_log_enabled", 1))
 
         # ==================== FRAMEWORK MODULES ====================
 
@@ -99,7 +100,8 @@ class MomentumFrameworkAlgorithm(QCAlgorithm):
                 max_drawdown_pct=max_drawdown,
                 daily_loss_limit=0.03,
                 position_stop_loss=0.05,
-                max_gross_exposure=2.0
+                max_gross_exposure=2.0,
+                log_enabled=risk_log_enabled
             )
         )
 
@@ -154,6 +156,7 @@ class EnhancedMomentumFrameworkAlgorithm(QCAlgorithm):
         lookback_days = self.get_parameter("lookback_days", 126)
         n_long = self.get_parameter("n_long", 5)
         n_short = self.get_parameter("n_short", 5)
+        risk_log_enabled = bool(self.get_parameter("risk_log_enabled", 1))
 
         # Framework Modules
         self.set_universe_selection(
@@ -185,13 +188,15 @@ class EnhancedMomentumFrameworkAlgorithm(QCAlgorithm):
                 max_drawdown_pct=0.10,
                 daily_loss_limit=0.03,
                 position_stop_loss=0.05,
-                target_volatility=0.15
+                target_volatility=0.15,
+                log_enabled=risk_log_enabled
             )
         )
 
         self.add_risk_management(
             SectorExposureRiskModel(
-                max_sector_exposure=0.30
+                max_sector_exposure=0.30,
+                log_enabled=risk_log_enabled
             )
         )
 
@@ -225,6 +230,7 @@ class EUCompliantMomentumAlgorithm(QCAlgorithm):
         lookback_days = 126
         n_long = 5
         n_short = 5
+        risk_log_enabled = bool(self.get_parameter("risk_log_enabled", 1))
 
         # EU-Compliant Universe
         self.set_universe_selection(
@@ -249,7 +255,8 @@ class EUCompliantMomentumAlgorithm(QCAlgorithm):
         self.add_risk_management(
             MomentumRiskManagementModel(
                 max_drawdown_pct=0.10,
-                daily_loss_limit=0.03
+                daily_loss_limit=0.03,
+                log_enabled=risk_log_enabled
             )
         )
 
@@ -0,0 +1,257 @@
+"""
+Momentum Strategy Kernels
+=========================
+
+Numeric kernels shared by the momentum alpha models, universe selection
+and solution algorithms.
+Compiled to native code with Numba when available,
+otherwise falls back to an equivalent NumPy implementation.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _score_and_confidence_numpy(momentum: np.ndarray, volatility: np.ndarray):
+    """NumPy fallback for score_and_confidence"""
+    scores = momentum / np.where(volatility > 0, volatility, 1.0)
+
+    # Reuse one deviation vector for both the std (dot product, no power op) and the z-scores
+    deviations = scores - scores.mean()
+    std = np.sqrt(np.dot(deviations, deviations) / scores.shape[0])
+
+    if std == 0:
+        return scores, np.full(scores.shape[0], 0.5)
+
+    confidences = np.clip(0.5 + np.abs(deviations) / std * 0.1, 0.3, 0.9)
+    return scores, confidences
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _score_and_confidence_numba(momentum, volatility):
+        """Numba kernel for score_and_confidence (single-pass Welford moments)"""
+        n = momentum.shape[0]
+        scores = np.empty(n, dtype=np.float64)
+        confidences = np.empty(n, dtype=np.float64)
+
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            vol = volatility[i]
+            score = momentum[i] / vol if vol > 0 else momentum[i]
+            scores[i] = score
+
+            delta = score - mean
+            mean += delta / (i + 1)
+            m2 += delta * (score - mean)
+
+        std = np.sqrt(m2 / n) if n > 0 else 0.0
+
+        for i in range(n):
+            if std == 0:
+                confidences[i] = 0.5
+            else:
+                confidence = 0.5 + abs(scores[i] - mean) / std * 0.1
+                confidences[i] = min(0.9, max(0.3, confidence))
+
+        return scores, confidences
+
+    _score_and_confidence = _score_and_confidence_numba
+else:
+    _score_and_confidence = _score_and_confidence_numpy
+
+
+def score_and_confidence(momentum: np.ndarray, volatility: np.ndarray):
+    """
+    Volatility-adjust momentum scores and derive z-score confidences
+
+    Args:
+        momentum: Raw momentum scores (float64)
+        volatility: Volatility per symbol (values <= 0 leave the score unadjusted)
+
+    Returns:
+        Tuple of (adjusted scores, confidences capped between 0.3 and 0.9)
+    """
+    return _score_and_confidence(momentum, volatility)
+
+
+def _momentum_scores_numpy(current: np.ndarray, past: np.ndarray):
+    """NumPy fallback for momentum_scores"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        momentum = (current / past - 1) * 100
+    valid = (past > 0) & (current > 0) & (np.abs(momentum) <= 500)
+    return momentum, valid
+
+
+def _select_long_short_numpy(values: np.ndarray, n_long: int, n_short: int):
+    """NumPy fallback for select_long_short (partition to the k-th value, sort only the candidates)"""
+    n = values.shape[0]
+    n_long = min(max(n_long, 0), n)
+    n_short = min(max(n_short, 0), n)
+
+    # Candidates at or beyond each k-th boundary value (all boundary ties included),
+    # stable-sorted so ties keep input order
+    long_idx = np.empty(0, dtype=np.int64)
+    if n_long > 0:
+        candidates = np.flatnonzero(values >= np.partition(values, n - n_long)[n - n_long])
+        long_idx = candidates[np.argsort(-values[candidates], kind='stable')][:n_long]
+
+    short_idx = np.empty(0, dtype=np.int64)
+    if n_short > 0:
+        candidates = np.flatnonzero(values <= np.partition(values, n_short - 1)[n_short - 1])
+        short_idx = candidates[np.argsort(-values[candidates], kind='stable')][candidates.shape[0] - n_short:]
+
+    return long_idx, short_idx
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _momentum_scores_numba(current, past):
+        """Numba kernel for momentum_scores (single pass, no temporaries)"""
+        n = current.shape[0]
+        momentum = np.empty(n, dtype=np.float64)
+        valid = np.empty(n, dtype=np.bool_)
+
+        for i in range(n):
+            if current[i] > 0 and past[i] > 0:
+                momentum[i] = (current[i] / past[i] - 1) * 100
+                valid[i] = abs(momentum[i]) <= 500
+            else:
+                momentum[i] = np.nan
+                valid[i] = False
+
+        return momentum, valid
+
+    @njit(cache=True)
+    def _select_long_short_numba(values, n_long, n_short):
+        """Numba kernel for select_long_short (single pass, insertion into k-sized buffers)"""
+        n = values.shape[0]
+        long_idx = np.empty(max(n_long, 0), dtype=np.int64)
+        short_idx = np.empty(max(n_short, 0), dtype=np.int64)
+        n_longs = 0
+        n_shorts = 0
+
+        for i in range(n):
+            value = values[i]
+
+            # Longs: highest first, earlier index wins ties
+            if n_long > 0 and (n_longs < n_long or value > values[long_idx[n_longs - 1]]):
+                j = min(n_longs, n_long - 1)
+                while j > 0 and values[long_idx[j - 1]] < value:
+                    long_idx[j] = long_idx[j - 1]
+                    j -= 1
+                long_idx[j] = i
+                n_longs = min(n_longs + 1, n_long)
+
+            # Shorts: lowest first, later index ranks lower on ties
+            if n_short > 0 and (n_shorts < n_short or value <= values[short_idx[n_shorts - 1]]):
+                j = min(n_shorts, n_short - 1)
+                while j > 0 and values[short_idx[j - 1]] >= value:
+                    short_idx[j] = short_idx[j - 1]
+                    j -= 1
+                short_idx[j] = i
+                n_shorts = min(n_shorts + 1, n_short)
+
+        return long_idx[:n_longs], short_idx[:n_shorts][::-1]
+
+    _momentum_scores = _momentum_scores_numba
+    _select_long_short = _select_long_short_numba
+else:
+    _momentum_scores = _momentum_scores_numpy
+    _select_long_short = _select_long_short_numpy
+
+
+def momentum_scores(current: np.ndarray, past: np.ndarray):
+    """
+    Percentage momentum between past and current prices
+
+    Args:
+        current: Current prices (float64)
+        past: Prices lookback bars ago (float64)
+
+    Returns:
+        Tuple of (momentum in percent, mask of positive prices with |momentum| <= 500)
+    """
+    return _momentum_scores(current, past)
+
+
+def select_long_short(values: np.ndarray, n_long: int, n_short: int):
+    """
+    Select the top and bottom ranked values without a full sort
+
+    Args:
+        values: Scores to rank (float64, no NaN)
+        n_long: Number of highest values to select
+        n_short: Number of lowest values to select
+
+    Returns:
+        Tuple of (long indices, short indices), each in descending order of value
+        with ties in input order
+    """
+    return _select_long_short(values, n_long, n_short)
+
+
+def _liquidity_order_numpy(
+    has_data: np.ndarray,
+    prices: np.ndarray,
+    dollar_volumes: np.ndarray,
+    min_price: float,
+    min_dollar_volume: float
+):
+    """NumPy fallback for liquidity_order"""
+    candidates = np.flatnonzero(
+        (has_data != 0) & ~(prices < min_price) & ~(dollar_volumes < min_dollar_volume)
+    )
+    return candidates[np.argsort(-dollar_volumes[candidates], kind='stable')]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _liquidity_order_numba(has_data, prices, dollar_volumes, min_price, min_dollar_volume):
+        """Numba kernel for liquidity_order (screens fused into one pass, then a stable sort)"""
+        n = prices.shape[0]
+        candidates = np.empty(n, dtype=np.int64)
+        keys = np.empty(n, dtype=np.float64)
+        count = 0
+
+        for i in range(n):
+            if has_data[i] != 0 and not prices[i] < min_price and not dollar_volumes[i] < min_dollar_volume:
+                candidates[count] = i
+                keys[count] = -dollar_volumes[i]
+                count += 1
+
+        order = np.argsort(keys[:count], kind='mergesort')
+        return candidates[:count][order]
+
+    _liquidity_order = _liquidity_order_numba
+else:
+    _liquidity_order = _liquidity_order_numpy
+
+
+def liquidity_order(
+    has_data: np.ndarray,
+    prices: np.ndarray,
+    dollar_volumes: np.ndarray,
+    min_price: float,
+    min_dollar_volume: float
+):
+    """
+    Indices passing the data, price and dollar volume screens, most liquid first
+
+    Args:
+        has_data: Fundamental data flags (float64, non-zero = available)
+        prices: Prices (float64)
+        dollar_volumes: Daily dollar volumes (float64)
+        min_price: Minimum price
+        min_dollar_volume: Minimum dollar volume
+
+    Returns:
+        Candidate indices in descending order of dollar volume with ties in input order
+    """
+    return _liquidity_order(has_data, prices, dollar_volumes, min_price, min_dollar_volume)
@@ -0,0 +1,266 @@
+"""
+LEAN Data Helpers
+=================
+
+Data loading helpers shared by the standalone momentum solution algorithms.
+
+IBKR .pkl price files used for momentum calculation are loaded in parallel,
+and can be precomputed once into memory-mapped daily-close Feather files so
+startup skips unpickling and resampling.
+
+Usage (one-time preprocess):
+    python lean_data.py --pkl <pkl_dir>
+"""
+
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Leveraged/inverse ETFs and the benchmark, skipped when loading .pkl files
+PKL_EXCLUDED_SYMBOLS = frozenset({
+    'TQQQ', 'SQQQ', 'TECL', 'TECS', 'SOXL', 'SOXS', 'UPRO', 'SPXU',
+    'SPXL', 'SPXS', 'TNA', 'TZA', 'UDOW', 'SDOW', 'LABU', 'LABD',
+    'NUGT', 'DUST', 'VXX', 'UVXY', 'SVXY', 'USO', 'UNG', 'GLD', 'SLV', 'SPY'
+})
+
+
+def pkl_symbol(pkl_file: Path) -> str:
+    """Extract the ticker from an IBKR .pkl file name"""
+    return pkl_file.stem.replace('_15Y_1H_IBKR', '').upper()
+
+
+def daily_close_feather_path(pkl_file: Path) -> Path:
+    """Path of the daily-close Feather file precomputed from an IBKR .pkl file"""
+    return pkl_file.with_name(f"{pkl_symbol(pkl_file)}_daily.feather")
+
+
+def _read_pkl_daily_close(pkl_file: Path) -> Optional[pd.Series]:
+    """Unpickle an IBKR .pkl file and reduce its closes to daily (full history)"""
+    with open(pkl_file, 'rb') as f:
+        data_dict = pickle.load(f)
+
+    if 'data' not in data_dict:
+        return None
+
+    # Pick the close column directly (no copy of the full OHLCV frame)
+    df = data_dict['data']
+    close = df['Adj_Close'] if 'Adj_Close' in df.columns else df['Close']
+
+    # Remove timezone if present
+    index = close.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    # Last close per calendar day, grouped on int64 day keys instead of a Resampler
+    day = index.values.astype('datetime64[D]').astype('datetime64[ns]')
+    daily = close.groupby(day).last().dropna()
+    daily.index = pd.DatetimeIndex(daily.index)
+    daily.name = 'Close'
+
+    return daily
+
+
+def _read_feather_daily_close(path: Path) -> pd.Series:
+    """Read a precomputed daily-close Feather file through a memory map"""
+    table = feather.read_table(str(path), memory_map=True)
+    dates = table['date'].to_numpy().astype('datetime64[ns]')
+    return pd.Series(table['close'].to_numpy(), index=pd.DatetimeIndex(dates), name='Close')
+
+
+def _write_daily_close_feather(close: pd.Series, path: Path):
+    """Write daily closes as an uncompressed (memory-mappable) Feather file"""
+    table = pa.table({
+        'date': pa.array(close.index.values.astype('datetime64[D]'), type=pa.date32()),
+        'close': pa.array(close.to_numpy(dtype='float64'))
+    })
+
+    # Uncompressed so readers can memory-map the columns without a decode copy
+    feather.write_feather(table, str(path), compression='uncompressed')
+
+
+def _is_up_to_date(feather_path: Path, pkl_file: Path) -> bool:
+    """Whether a precomputed Feather file exists and is not older than its .pkl source"""
+    try:
+        return feather_path.stat().st_mtime >= pkl_file.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def convert_pkl_file(pkl_file: Path) -> Optional[Path]:
+    """
+    Precompute the daily closes of an IBKR .pkl file into a Feather file
+
+    Args:
+        pkl_file: IBKR .pkl file holding {'data': DataFrame}
+
+    Returns:
+        Path of the written Feather file, or None if conversion was not possible
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+
+    try:
+        close = _read_pkl_daily_close(pkl_file)
+    except Exception:
+        return None
+
+    if close is None:
+        return None
+
+    output_path = daily_close_feather_path(pkl_file)
+    _write_daily_close_feather(close, output_path)
+    return output_path
+
+
+def convert_all_pkl_files(pkl_dir: Path) -> int:
+    """Convert every IBKR .pkl file in pkl_dir, returning the number converted"""
+    return sum(1 for pkl_file in sorted(pkl_dir.glob('*.pkl')) if convert_pkl_file(pkl_file))
+
+
+def load_pkl_daily_close(
+    pkl_file: Path,
+    min_bars: int,
+    start: str = '2015-01-01',
+    end: str = '2024-12-31'
+) -> Optional[pd.Series]:
+    """
+    Load the daily closes of one .pkl file
+
+    Reads the precomputed Feather file when it is at least as new as the
+    .pkl, otherwise unpickles and reduces the hourly data to daily closes
+    (refreshing a stale Feather file so later loads can use it again).
+
+    Args:
+        pkl_file: IBKR .pkl file holding {'data': DataFrame}
+        min_bars: Minimum number of daily bars required
+        start: First date kept
+        end: Last date kept
+
+    Returns:
+        Daily close series, or None if the file is unusable
+    """
+    try:
+        feather_path = daily_close_feather_path(pkl_file)
+        if PYARROW_AVAILABLE and _is_up_to_date(feather_path, pkl_file):
+            close = _read_feather_daily_close(feather_path)
+        else:
+            close = _read_pkl_daily_close(pkl_file)
+
+            # A Feather file older than its .pkl is stale - convert it again
+            if close is not None and PYARROW_AVAILABLE and feather_path.exists():
+                try:
+                    _write_daily_close_feather(close, feather_path)
+                except OSError:
+                    pass
+
+        if close is None:
+            return None
+
+        # Filter to backtest period (sorted index: slice between two binary searches)
+        dates = close.index.values
+        first = np.searchsorted(dates, np.datetime64(start), side='left')
+        last = np.searchsorted(dates, np.datetime64(end), side='right')
+        close = close.iloc[first:last]
+
+        if len(close) < min_bars:  # Need enough data
+            return None
+
+        return close
+
+    except Exception:
+        return None
+
+
+def stack_daily_closes(
+    symbols_data: Dict[str, pd.Series]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stack per-symbol daily closes into flat arrays for vectorized lookups
+
+    Args:
+        symbols_data: Daily close series by symbol (sorted by date)
+
+    Returns:
+        Tuple of (date_index, closes, offsets, counts): date_index is the sorted
+        union of all dates as datetime64[D], closes holds every symbol's closes back to back with
+        symbol j starting at offsets[j], and counts[i, j] is the number of closes
+        symbol j has on or before date_index[i]
+    """
+    series = list(symbols_data.values())
+    if not series:
+        return (np.empty(0, dtype='datetime64[D]'), np.empty(0),
+                np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.int64))
+
+    date_index = np.unique(np.concatenate([s.index.values for s in series]))
+    closes = np.concatenate([s.to_numpy(dtype=np.float64) for s in series])
+    lengths = np.array([len(s) for s in series], dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+
+    counts = np.empty((len(date_index), len(series)), dtype=np.int64)
+    for j, s in enumerate(series):
+        counts[:, j] = np.searchsorted(s.index.values, date_index, side='right')
+
+    # Daily bars are stamped at midnight, so day precision is lossless
+    return date_index.astype('datetime64[D]'), closes, offsets, counts
+
+
+def load_pkl_directory(
+    data_dir: Path,
+    min_bars: int,
+    max_files: int = 100,
+    max_workers: Optional[int] = None
+) -> Dict[str, pd.Series]:
+    """
+    Load daily closes for the first max_files .pkl files in parallel
+
+    Threads are used rather than processes: the algorithm runs inside the
+    LEAN (.NET) host, which cannot be safely forked or re-spawned. Only the
+    file reads release the GIL; unpickling and the daily reduction hold it,
+    so the threads overlap disk I/O rather than scaling CPU-bound loads.
+    Precomputed daily Feather files (convert_pkl_file) avoid that work.
+
+    Args:
+        data_dir: Directory with .pkl files
+        min_bars: Minimum number of daily bars required per symbol
+        max_files: Number of files to consider (in directory order)
+        max_workers: Worker threads (default: CPU count)
+
+    Returns:
+        Daily close series by symbol, in file order
+    """
+    pkl_files = [
+        pkl_file for pkl_file in list(data_dir.glob('*.pkl'))[:max_files]
+        if pkl_symbol(pkl_file) not in PKL_EXCLUDED_SYMBOLS
+    ]
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        closes = executor.map(lambda f: load_pkl_daily_close(f, min_bars), pkl_files)
+
+        return {
+            pkl_symbol(pkl_file): close
+            for pkl_file, close in zip(pkl_files, closes)
+            if close is not None
+        }
+
+
+if __name__ == "__main__":
+    if not PYARROW_AVAILABLE:
+        sys.exit("pyarrow is required to convert .pkl data")
+
+    if len(sys.argv) != 3 or sys.argv[1] != '--pkl':
+        sys.exit("Usage: python lean_data.py --pkl <pkl_dir>")
+
+    print(f"Converted {convert_all_pkl_files(Path(sys.argv[2]))} .pkl files to daily Feather")
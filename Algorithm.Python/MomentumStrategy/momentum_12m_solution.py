@@ -6,15 +6,21 @@ Uses CustomData to read from converted LEAN ZIP files
 """
 from AlgorithmImports import *
 from datetime import timedelta
-import pickle
-import pandas as pd
+import numpy as np
 from pathlib import Path
 import zipfile
 import io
+import traceback
+
+from kernels import momentum_scores, select_long_short
+from lean_data import load_pkl_directory, stack_daily_closes
 
 class LeanEquityData(PythonData):
     """Custom data class that reads from LEAN format ZIP files"""
-    
+
+    # Daily bar period, built once instead of per row
+    _ONE_DAY = timedelta(days=1)
+
     def get_source(self, config, date, is_live_mode):
         """Return the source - LEAN format ZIP file"""
         # Try both local and Docker paths
@@ -42,29 +48,30 @@ class LeanEquityData(PythonData):
                 return None
             
             # Parse LEAN format: YYYYMMDD HH:MM,Open,High,Low,Close,Volume
-            time_str = csv[0].strip()
+            date_key = int(csv[0].split()[0])
             open_price = float(csv[1])
             high_price = float(csv[2])
             low_price = float(csv[3])
             close_price = float(csv[4])
             volume = int(csv[5])
             
-            # Parse time
-            date_part = time_str.split()[0]
-            time_obj = datetime.strptime(date_part, '%Y%m%d')
+            # Parse time (YYYYMMDD via integer arithmetic instead of strptime)
+            year, month_day = divmod(date_key, 10000)
+            month, day = divmod(month_day, 100)
+            time_obj = datetime(year, month, day)
             
             # Create TradeBar-like data
             data = LeanEquityData()
             data.symbol = config.symbol
             data.time = time_obj
-            data.end_time = time_obj + timedelta(days=1)
+            data.end_time = time_obj + LeanEquityData._ONE_DAY
             data.value = close_price  # Set Value property - this is critical!
             data.open = open_price
             data.high = high_price
             data.low = low_price
             data.close = close_price
             data.volume = volume
-            data.period = timedelta(days=1)
+            data.period = LeanEquityData._ONE_DAY
             
             return data
         except Exception as e:
@@ -97,6 +104,11 @@ class Momentum12MSolutionAlgorithm(QCAlgorithm):
         # Load available symbols from .pkl files for momentum calculation
         self.symbols_data = self.load_symbols_data()
         
+        # Stack .pkl closes once so momentum is scored for all symbols in one vectorized step
+        self.momentum_symbols = list(self.symbols_data.keys())
+        self.date_index, self.close_values, self.close_offsets, self.close_counts = \
+            stack_daily_closes(self.symbols_data)
+        
         # Add symbols using CustomData (reads from LEAN ZIP files)
         self.symbols = {}
         for symbol_str in list(self.symbols_data.keys())[:50]:  # Limit to 50 for performance
@@ -140,150 +152,107 @@ class Momentum12MSolutionAlgorithm(QCAlgorithm):
             self.log(f"ERROR: Data directory not found: {self.data_dir}")
             return symbols_data
         
-        # Get all .pkl files
-        pkl_files = list(self.data_dir.glob('*.pkl'))
-        
-        for pkl_file in pkl_files[:100]:  # Limit to first 100 for performance
-            try:
-                # Extract symbol from filename
-                symbol = pkl_file.stem.replace('_15Y_1H_IBKR', '').upper()
-                
-                # Skip excluded symbols
-                excluded = {'TQQQ', 'SQQQ', 'TECL', 'TECS', 'SOXL', 'SOXS', 'UPRO', 'SPXU',
-                           'SPXL', 'SPXS', 'TNA', 'TZA', 'UDOW', 'SDOW', 'LABU', 'LABD',
-                           'NUGT', 'DUST', 'VXX', 'UVXY', 'SVXY', 'USO', 'UNG', 'GLD', 'SLV', 'SPY'}
-                if symbol in excluded:
-                    continue
-                
-                # Load pickle file
-                with open(pkl_file, 'rb') as f:
-                    data_dict = pickle.load(f)
-                
-                if 'data' not in data_dict:
-                    continue
-                
-                df = data_dict['data'].copy()
-                
-                # Remove timezone if present
-                if df.index.tz is not None:
-                    df.index = df.index.tz_localize(None)
-                
-                # Resample to daily
-                daily = pd.DataFrame()
-                daily['Close'] = df['Adj_Close'].resample('D').last() if 'Adj_Close' in df.columns else df['Close'].resample('D').last()
-                daily = daily.dropna()
-                
-                # Filter to backtest period
-                daily = daily[(daily.index >= pd.Timestamp('2015-01-01')) & 
-                             (daily.index <= pd.Timestamp('2024-12-31'))]
-                
-                if len(daily) < self.lookback_days + 100:  # Need enough data
-                    continue
-                
-                symbols_data[symbol] = daily['Close']
-                
-            except Exception as e:
-                continue
+        # Load files in parallel (same file limit and exclusions as before)
+        symbols_data = load_pkl_directory(self.data_dir, self.lookback_days + 100)
         
         return symbols_data
     
     def calculate_momentum_scores(self):
-        """Calculate momentum scores from loaded .pkl data"""
-        scores = {}
-        current_date = pd.Timestamp(self.time)
+        """
+        Calculate momentum scores from loaded .pkl data
         
-        for symbol_str, prices in self.symbols_data.items():
-            try:
-                # Calculate momentum from historical data
-                prices_series = prices[prices.index <= current_date]
-                
-                if len(prices_series) < self.lookback_days + 1:
-                    continue
-                
-                # Get current and past prices from .pkl data
-                current_price_pkl = prices_series.iloc[-1]
-                past_price = prices_series.iloc[-self.lookback_days]
-                
-                # Calculate momentum (percentage change)
-                if past_price > 0 and current_price_pkl > 0:
-                    momentum = (current_price_pkl / past_price - 1) * 100
-                else:
-                    continue
-                
-                # Filter extreme values
-                if abs(momentum) > 500:
-                    continue
-                
-                scores[symbol_str] = momentum
-                
-            except Exception as e:
-                continue
+        Returns:
+            Tuple of (symbol list, momentum array aligned with it)
+        """
+        # Last stacked date on or before today (binary search, no pandas in the hot path)
+        idx = np.searchsorted(self.date_index, np.datetime64(self.time.date()), side='right') - 1
+        if idx < 0:
+            return [], np.empty(0)
+        
+        # Symbols with enough history (closes up to current date)
+        counts = self.close_counts[idx]
+        eligible = np.flatnonzero(counts >= self.lookback_days + 1)
+        ends = self.close_offsets[eligible] + counts[eligible]
         
-        return scores
+        # Get current and past prices from .pkl data
+        current_price_pkl = self.close_values[ends - 1]
+        past_price = self.close_values[ends - self.lookback_days]
+        
+        # Calculate momentum (percentage change), skipping non-positive prices and extreme values
+        momentum, valid = momentum_scores(current_price_pkl, past_price)
+        
+        symbols = self.momentum_symbols
+        return [symbols[i] for i in eligible[valid].tolist()], momentum[valid]
     
     def rebalance(self):
         """Rebalance portfolio based on momentum"""
         if self.is_warming_up:
             return
         
-        scores = self.calculate_momentum_scores()
+        symbols, momentum = self.calculate_momentum_scores()
         
-        if len(scores) < (self.n_long + self.n_short):
+        if len(symbols) < (self.n_long + self.n_short):
             if self.time.day % 5 == 0:  # Log every 5 days
-                self.log(f"Insufficient securities with momentum data: {len(scores)} (need {self.n_long + self.n_short})")
+                self.log(f"Insufficient securities with momentum data: {len(symbols)} (need {self.n_long + self.n_short})")
             return
         
-        # Rank by momentum
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        # Select long and short positions without sorting the whole universe
+        # (both legs ordered by momentum descending, ties in universe order)
+        top, bottom = select_long_short(momentum, self.n_long, self.n_short)
+        top = top.tolist()
+        bottom = bottom.tolist()
         
-        # Select long and short positions
-        long_symbols = [x[0] for x in ranked[:self.n_long]]
-        short_symbols = [x[0] for x in ranked[-self.n_short:]]
+        long_symbols = [symbols[i] for i in top]
+        short_symbols = [symbols[i] for i in bottom]
+        scores = {symbols[i]: momentum[i] for i in top + bottom}
         
         # Calculate weights
         total_positions = self.n_long + self.n_short
         weight = 1.0 / total_positions
         
-        # Liquidate positions not in new targets
+        # Liquidate positions not in new targets (set built once for O(1) membership)
+        keep = frozenset(long_symbols).union(short_symbols)
         for holding in self.portfolio.values():
-            if holding.invested and holding.symbol.value not in long_symbols + short_symbols:
+            if holding.invested and holding.symbol.value not in keep:
                 if holding.symbol.value != "SPY":
                     self.liquidate(holding.symbol)
         
+        # Resolve tracked symbols once for order placement and the summary
+        long_lookup = [(s, self.symbols[s]) for s in long_symbols if s in self.symbols]
+        short_lookup = [(s, self.symbols[s]) for s in short_symbols if s in self.symbols]
+        
         # Set target positions - use set_holdings which works with CustomData
-        for symbol_str in long_symbols:
-            if symbol_str in self.symbols:
-                symbol = self.symbols[symbol_str]
-                try:
-                    # Check if we have data
-                    if symbol in self.current_slice and symbol in self.securities:
-                        security = self.securities[symbol]
-                        if security.has_data and security.price > 0:
-                            self.set_holdings(symbol, weight)
-                            self.log(f"LONG: {symbol_str} (weight: {weight:.1%}, momentum: {scores[symbol_str]:+.2f}%)")
-                except Exception as e:
-                    self.log(f"ERROR setting LONG {symbol_str}: {e}")
-        
-        for symbol_str in short_symbols:
-            if symbol_str in self.symbols:
-                symbol = self.symbols[symbol_str]
-                try:
-                    # Check if we have data
-                    if symbol in self.current_slice and symbol in self.securities:
-                        security = self.securities[symbol]
-                        if security.has_data and security.price > 0:
-                            self.set_holdings(symbol, -weight)
-                            self.log(f"SHORT: {symbol_str} (weight: {-weight:.1%}, momentum: {scores[symbol_str]:+.2f}%)")
-                except Exception as e:
-                    self.log(f"ERROR setting SHORT {symbol_str}: {e}")
+        for symbol_str, symbol in long_lookup:
+            try:
+                # Check if we have data
+                if symbol in self.current_slice and symbol in self.securities:
+                    security = self.securities[symbol]
+                    if security.has_data and security.price > 0:
+                        self.set_holdings(symbol, weight)
+                        self.log(f"LONG: {symbol_str} (weight: {weight:.1%}, momentum: {scores[symbol_str]:+.2f}%)")
+            except Exception as e:
+                self.log(f"ERROR setting LONG {symbol_str}: {e}")
+        
+        for symbol_str, symbol in short_lookup:
+            try:
+                # Check if we have data
+                if symbol in self.current_slice and symbol in self.securities:
+                    security = self.securities[symbol]
+                    if security.has_data and security.price > 0:
+                        self.set_holdings(symbol, -weight)
+                        self.log(f"SHORT: {symbol_str} (weight: {-weight:.1%}, momentum: {scores[symbol_str]:+.2f}%)")
+            except Exception as e:
+                self.log(f"ERROR setting SHORT {symbol_str}: {e}")
         
         # Log summary
-        long_val = sum(self.portfolio[self.symbols[s]].holdings_value for s in long_symbols if s in self.symbols and self.portfolio[self.symbols[s]].invested)
-        short_val = sum(abs(self.portfolio[self.symbols[s]].holdings_value) for s in short_symbols if s in self.symbols and self.portfolio[self.symbols[s]].invested)
-        self.log(f"REBALANCE: Long ${long_val:,.0f} | Short ${short_val:,.0f} | Total Positions: {len([s for s in long_symbols + short_symbols if s in self.symbols and self.portfolio[self.symbols[s]].invested])}")
+        long_invested = [h for h in (self.portfolio[symbol] for _, symbol in long_lookup) if h.invested]
+        short_invested = [h for h in (self.portfolio[symbol] for _, symbol in short_lookup) if h.invested]
+        long_val = sum(h.holdings_value for h in long_invested)
+        short_val = sum(abs(h.holdings_value) for h in short_invested)
+        self.log(f"REBALANCE: Long ${long_val:,.0f} | Short ${short_val:,.0f} | Total Positions: {len(long_invested) + len(short_invested)}")
     
     def on_order_event(self, order_event):
-        """Log all order events for reporting"""
+        """Record filled orders for the end-of-algorithm report"""
         if order_event.status == OrderStatus.FILLED:
             try:
                 order = self.transactions.get_order_by_id(order_event.order_id)
@@ -312,9 +281,7 @@ class Momentum12MSolutionAlgorithm(QCAlgorithm):
                             if (holding.quantity > 0 and fill_quantity < 0) or (holding.quantity < 0 and fill_quantity > 0):
                                 tag = "Liquidated"
                 
-                # Store order for reporting
-                if not hasattr(self, 'all_orders'):
-                    self.all_orders = []
+                # Store order for reporting (logged in one batch at end of algorithm)
                 self.all_orders.append({
                     'date': order_event.utc_time.strftime('%Y-%m-%d %H:%M:%S'),
                     'symbol': order_event.symbol.value,
@@ -324,12 +291,8 @@ class Momentum12MSolutionAlgorithm(QCAlgorithm):
                     'status': 'Filled',
                     'tag': tag
                 })
-                
-                # Log to console with full details
-                self.log(f"ORDER FILLED: {order_event.utc_time.strftime('%Y-%m-%d %H:%M:%S')} | {order_event.symbol.value} | {order_type} | Fill: ${fill_price:.2f} USD | Qty: {quantity} | Tag: {tag}")
             except Exception as e:
                 self.log(f"ERROR in on_order_event: {e}")
-                import traceback
                 self.log(f"Traceback: {traceback.format_exc()}")
     
     def on_end_of_algorithm(self):
@@ -338,7 +301,11 @@ class Momentum12MSolutionAlgorithm(QCAlgorithm):
         total_return = (final_equity - 5000) / 5000
         
         # Log all orders summary
-        if hasattr(self, 'all_orders') and self.all_orders:
+        if self.all_orders:
+            self.log("\n".join(
+                f"ORDER FILLED: {o['date']} | {o['symbol']} | {o['type']} | Fill: ${o['price']:.2f} USD | Qty: {o['quantity']} | Tag: {o['tag']}"
+                for o in self.all_orders
+            ))
             self.log("=" * 60)
             self.log(f"TOTAL ORDERS EXECUTED: {len(self.all_orders)}")
             self.log("=" * 60)
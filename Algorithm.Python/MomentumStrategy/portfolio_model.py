@@ -86,15 +86,8 @@ class MomentumPortfolioConstructionModel(PortfolioConstructionModel):
         # Update insight collection
         self.insight_collection.add_range(insights)
 
-        # Get active insights
-        active_insights = list(self.insight_collection.get_active_insights(algorithm.utc_time))
-
-        if not active_insights:
-            return targets
-
-        # Separate long and short insights
-        long_insights = [i for i in active_insights if i.direction == InsightDirection.UP]
-        short_insights = [i for i in active_insights if i.direction == InsightDirection.DOWN]
+        # Get active insights, separated into long and short
+        long_insights, short_insights = self._partition_active_insights(algorithm)
 
         # Calculate base weights (equal weight)
         total_positions = len(long_insights) + len(short_insights)
@@ -106,31 +99,44 @@ class MomentumPortfolioConstructionModel(PortfolioConstructionModel):
         # Apply position limits
         weight = min(base_weight, self.max_position_weight)
 
-        # Generate targets
-        for insight in long_insights:
-            targets.append(PortfolioTarget(insight.symbol, weight))
-
-        for insight in short_insights:
-            targets.append(PortfolioTarget(insight.symbol, -weight))
+        # Signed weights aligned with long then short symbols
+        long_count = len(long_insights)
+        weights = np.empty(total_positions)
+        weights[:long_count] = weight
+        weights[long_count:] = -weight
 
         # Validate gross exposure
-        gross_exposure = sum(abs(t.quantity) for t in targets)
+        gross_exposure = float(np.abs(weights).sum())
         if gross_exposure > self.max_gross_exposure:
             # Scale down proportionally
-            scale = self.max_gross_exposure / gross_exposure
-            targets = [PortfolioTarget(t.symbol, t.quantity * scale) for t in targets]
+            weights *= self.max_gross_exposure / gross_exposure
+
+        # Generate targets
+        symbols = [insight.symbol for insight in long_insights] + [insight.symbol for insight in short_insights]
+        targets = [PortfolioTarget(symbol, w) for symbol, w in zip(symbols, weights.tolist())]
 
         # Update tracking
         self.last_rebalance_time = algorithm.time
 
         # Log summary
-        long_count = len(long_insights)
         short_count = len(short_insights)
         algorithm.log(f"Portfolio: {long_count} long, {short_count} short, "
                      f"weight: {weight:.1%}, gross: {gross_exposure:.1%}")
 
         return targets
 
+    def _partition_active_insights(self, algorithm: QCAlgorithm) -> tuple[list[Insight], list[Insight]]:
+        """Split the active insights into long and short lists in a single pass"""
+        long_insights = []
+        short_insights = []
+        for insight in self.insight_collection.get_active_insights(algorithm.utc_time):
+            if insight.direction == InsightDirection.UP:
+                long_insights.append(insight)
+            elif insight.direction == InsightDirection.DOWN:
+                short_insights.append(insight)
+
+        return long_insights, short_insights
+
     def on_securities_changed(self, algorithm: QCAlgorithm, changes: SecurityChanges):
         """Handle security changes"""
         # Remove insights for removed securities
@@ -160,48 +166,61 @@ class ConfidenceWeightedPortfolioModel(MomentumPortfolioConstructionModel):
         # Update insight collection
         self.insight_collection.add_range(insights)
 
-        # Get active insights
-        active_insights = list(self.insight_collection.get_active_insights(algorithm.utc_time))
+        # Get active insights, separated into long and short
+        long_insights, short_insights = self._partition_active_insights(algorithm)
 
-        if not active_insights:
+        if not long_insights and not short_insights:
             return targets
 
-        # Separate long and short
-        long_insights = [i for i in active_insights if i.direction == InsightDirection.UP]
-        short_insights = [i for i in active_insights if i.direction == InsightDirection.DOWN]
-
-        # Calculate confidence-weighted allocation
-        def confidence_weights(insights_list):
-            if not insights_list:
-                return {}
-            total_conf = sum(i.confidence for i in insights_list)
-            if total_conf == 0:
-                return {i.symbol: 1.0 / len(insights_list) for i in insights_list}
-            return {i.symbol: i.confidence / total_conf for i in insights_list}
-
-        long_weights = confidence_weights(long_insights)
-        short_weights = confidence_weights(short_insights)
-
         # Allocate 50% to long, 50% to short (market neutral)
         long_allocation = 0.5
         short_allocation = 0.5
 
-        # Generate targets
-        for symbol, rel_weight in long_weights.items():
-            weight = rel_weight * long_allocation
-            weight = min(weight, self.max_position_weight)
-            targets.append(PortfolioTarget(symbol, weight))
-
-        for symbol, rel_weight in short_weights.items():
-            weight = rel_weight * short_allocation
-            weight = min(weight, self.max_position_weight)
-            targets.append(PortfolioTarget(symbol, -weight))
+        # Generate confidence-weighted targets
+        targets.extend(self._confidence_targets(long_insights, long_allocation, 1))
+        targets.extend(self._confidence_targets(short_insights, short_allocation, -1))
 
         # Update tracking
         self.last_rebalance_time = algorithm.time
 
         return targets
 
+    def _confidence_targets(
+        self,
+        insights_list: List[Insight],
+        allocation: float,
+        sign: int
+    ) -> List[PortfolioTarget]:
+        """
+        Confidence-weighted targets for one side of the book
+
+        Args:
+            insights_list: Insights for one direction
+            allocation: Gross allocation for this side
+            sign: 1 for long, -1 for short
+
+        Returns:
+            One target per symbol (a later insight for a symbol replaces its confidence)
+        """
+        if not insights_list:
+            return []
+
+        # Accumulate the total and per-symbol confidence in a single pass
+        confidences: Dict[Symbol, float] = {}
+        total_conf = 0
+        for insight in insights_list:
+            confidences[insight.symbol] = insight.confidence
+            total_conf += insight.confidence
+
+        if total_conf == 0:
+            equal_weight = min(1.0 / len(insights_list) * allocation, self.max_position_weight)
+            return [PortfolioTarget(symbol, sign * equal_weight) for symbol in confidences]
+
+        return [
+            PortfolioTarget(symbol, sign * min(confidence / total_conf * allocation, self.max_position_weight))
+            for symbol, confidence in confidences.items()
+        ]
+
 
 class RiskParityPortfolioModel(MomentumPortfolioConstructionModel):
     """
@@ -235,22 +254,13 @@ class RiskParityPortfolioModel(MomentumPortfolioConstructionModel):
 
         # Update insight collection
         self.insight_collection.add_range(insights)
-        active_insights = list(self.insight_collection.get_active_insights(algorithm.utc_time))
+        long_insights, short_insights = self._partition_active_insights(algorithm)
 
-        if not active_insights:
+        if not long_insights and not short_insights:
             return targets
 
-        # Get volatilities for each symbol
-        volatilities = {}
-        for insight in active_insights:
-            symbol = insight.symbol
-            if symbol in algorithm.securities:
-                history = algorithm.history(symbol, self.volatility_lookback, Resolution.DAILY)
-                if len(history) >= self.volatility_lookback // 2:
-                    returns = history['close'].pct_change().dropna()
-                    vol = returns.std() * np.sqrt(252)  # Annualized
-                    if vol > 0:
-                        volatilities[symbol] = vol
+        # Get volatilities for all symbols from a single history request
+        volatilities = self._calculate_volatilities(algorithm, long_insights + short_insights)
 
         if not volatilities:
             # Fall back to equal weight
@@ -259,11 +269,9 @@ class RiskParityPortfolioModel(MomentumPortfolioConstructionModel):
         # Calculate inverse volatility weights
         inv_vols = {s: 1.0 / v for s, v in volatilities.items()}
 
-        # Separate long and short
-        long_insights = [i for i in active_insights if i.direction == InsightDirection.UP
-                        and i.symbol in inv_vols]
-        short_insights = [i for i in active_insights if i.direction == InsightDirection.DOWN
-                         and i.symbol in inv_vols]
+        # Keep insights with a volatility estimate
+        long_insights = [i for i in long_insights if i.symbol in inv_vols]
+        short_insights = [i for i in short_insights if i.symbol in inv_vols]
 
         # Calculate weights
         long_inv_vol_sum = sum(inv_vols[i.symbol] for i in long_insights) if long_insights else 1
@@ -282,3 +290,42 @@ class RiskParityPortfolioModel(MomentumPortfolioConstructionModel):
         self.last_rebalance_time = algorithm.time
 
         return targets
+
+    def _calculate_volatilities(
+        self,
+        algorithm: QCAlgorithm,
+        insights: List[Insight]
+    ) -> Dict[Symbol, float]:
+        """
+        Annualized close-to-close volatility per insight symbol
+
+        Args:
+            algorithm: Algorithm instance
+            insights: Active long and short insights
+
+        Returns:
+            Positive volatilities for symbols with at least half the lookback of history
+        """
+        symbols = list(dict.fromkeys(
+            insight.symbol for insight in insights if insight.symbol in algorithm.securities
+        ))
+        if not symbols:
+            return {}
+
+        history = algorithm.history(symbols, self.volatility_lookback, Resolution.DAILY)
+        if history.empty:
+            return {}
+
+        # Per-symbol returns and standard deviations, computed column-wise by group
+        closes = history['close']
+        by_symbol = closes.groupby(level=0)
+        bar_counts = by_symbol.size()
+        returns = closes / by_symbol.shift(1) - 1
+        vols = returns.groupby(level=0).std() * np.sqrt(252)  # Annualized
+
+        volatilities = {}
+        for ticker, vol in vols.items():
+            if bar_counts[ticker] >= self.volatility_lookback // 2 and vol > 0:
+                volatilities[SymbolCache.get_symbol(ticker)] = vol
+
+        return volatilities
@@ -7,7 +7,7 @@ Implements multiple kill switches and position limits.
 """
 
 from AlgorithmImports import *
-from datetime import timedelta, datetime
+from datetime import date, timedelta, datetime
 from typing import List, Dict, Optional
 
 
@@ -29,7 +29,8 @@ class MomentumRiskManagementModel(RiskManagementModel):
         daily_loss_limit: float = 0.03,
         position_stop_loss: float = 0.05,
         max_gross_exposure: float = 2.0,
-        trailing_stop_pct: float = 0.08
+        trailing_stop_pct: float = 0.08,
+        log_enabled: bool = True
     ):
         """
         Initialize risk management model
@@ -40,6 +41,7 @@ class MomentumRiskManagementModel(RiskManagementModel):
             position_stop_loss: Stop loss per position (default 5%)
             max_gross_exposure: Maximum gross exposure (default 200%)
             trailing_stop_pct: Trailing stop percentage (default 8%)
+            log_enabled: Emit risk event logs (disable to skip message formatting)
         """
         super().__init__()
 
@@ -48,6 +50,7 @@ class MomentumRiskManagementModel(RiskManagementModel):
         self.position_stop_loss = position_stop_loss
         self.max_gross_exposure = max_gross_exposure
         self.trailing_stop_pct = trailing_stop_pct
+        self._log_enabled = log_enabled
 
         # Tracking
         self.high_water_mark = 0.0
@@ -55,6 +58,9 @@ class MomentumRiskManagementModel(RiskManagementModel):
         self.last_equity_date = None
         self.position_high_marks: Dict[Symbol, float] = {}
 
+        # Reusable zero-quantity liquidation targets by symbol
+        self._zero_targets: Dict[Symbol, PortfolioTarget] = {}
+
         # Risk state
         self.is_risk_off = False
         self.risk_off_until: Optional[datetime] = None
@@ -74,6 +80,9 @@ class MomentumRiskManagementModel(RiskManagementModel):
         Returns:
             Adjusted portfolio targets
         """
+        # Snapshot CLR properties once per call
+        now = algorithm.time
+        today = now.date()
         current_equity = algorithm.portfolio.total_portfolio_value
 
         # Initialize on first call
@@ -82,9 +91,9 @@ class MomentumRiskManagementModel(RiskManagementModel):
             self.daily_starting_equity = current_equity
 
         # Reset daily tracking
-        if self.last_equity_date != algorithm.time.date():
+        if self.last_equity_date != today:
             self.daily_starting_equity = current_equity
-            self.last_equity_date = algorithm.time.date()
+            self.last_equity_date = today
 
         # Update high water mark
         if current_equity > self.high_water_mark:
@@ -92,24 +101,33 @@ class MomentumRiskManagementModel(RiskManagementModel):
 
         # Check if we're in risk-off mode
         if self.is_risk_off:
-            if algorithm.time < self.risk_off_until:
+            if now < self.risk_off_until:
                 # Stay in risk-off mode - liquidate all
                 return self._liquidate_all(algorithm, targets, "Risk-off mode active")
             else:
                 # Exit risk-off mode
                 self.is_risk_off = False
-                algorithm.log("Risk-off mode ended")
+                if self._log_enabled:
+                    algorithm.log("Risk-off mode ended")
 
         # Check portfolio-level risk limits
-        risk_targets = self._check_portfolio_risk(algorithm, targets, current_equity)
+        risk_targets = self._check_portfolio_risk(algorithm, targets, current_equity, now)
         if risk_targets is not None:
             return risk_targets
 
         # Check position-level risk limits
         targets = self._check_position_risk(algorithm, targets)
 
-        # Check gross exposure
-        targets = self._check_gross_exposure(algorithm, targets, current_equity)
+        # Gross exposure and any model-specific scaling share a single rebuild
+        scale_factor = (
+            self._check_gross_exposure(algorithm, current_equity)
+            * self._scale_factor(algorithm, today)
+        )
+        if scale_factor < 1.0:
+            targets = [
+                PortfolioTarget(t.symbol, t.quantity * scale_factor)
+                for t in targets
+            ]
 
         return targets
 
@@ -117,22 +135,25 @@ class MomentumRiskManagementModel(RiskManagementModel):
         self,
         algorithm: QCAlgorithm,
         targets: List[PortfolioTarget],
-        current_equity: float
+        current_equity: float,
+        now: datetime
     ) -> Optional[List[PortfolioTarget]]:
         """Check portfolio-level risk limits"""
 
         # Check max drawdown
         drawdown = (self.high_water_mark - current_equity) / self.high_water_mark
         if drawdown > self.max_drawdown_pct:
-            algorithm.log(f"MAX DRAWDOWN BREACHED: {drawdown:.2%} > {self.max_drawdown_pct:.0%}")
-            self._enter_risk_off_mode(algorithm, timedelta(days=1))
+            if self._log_enabled:
+                algorithm.log(f"MAX DRAWDOWN BREACHED: {drawdown:.2%} > {self.max_drawdown_pct:.0%}")
+            self._enter_risk_off_mode(algorithm, now, timedelta(days=1))
             return self._liquidate_all(algorithm, targets, "Max drawdown limit")
 
         # Check daily loss limit
         daily_pnl = (current_equity - self.daily_starting_equity) / self.daily_starting_equity
         if daily_pnl < -self.daily_loss_limit:
-            algorithm.log(f"DAILY LOSS LIMIT BREACHED: {daily_pnl:.2%}")
-            self._enter_risk_off_mode(algorithm, timedelta(hours=24))
+            if self._log_enabled:
+                algorithm.log(f"DAILY LOSS LIMIT BREACHED: {daily_pnl:.2%}")
+            self._enter_risk_off_mode(algorithm, now, timedelta(hours=24))
             return self._liquidate_all(algorithm, targets, "Daily loss limit")
 
         return None
@@ -143,25 +164,31 @@ class MomentumRiskManagementModel(RiskManagementModel):
         targets: List[PortfolioTarget]
     ) -> List[PortfolioTarget]:
         """Check position-level risk limits"""
+        portfolio = algorithm.portfolio
+
+        # Nothing held - no stops can trigger, every target passes through
+        if not portfolio.invested:
+            return list(targets)
+
         adjusted_targets = []
 
         for target in targets:
             symbol = target.symbol
 
             # Get current position
-            holding = algorithm.portfolio[symbol]
+            holding = portfolio[symbol]
 
             if not holding.invested:
                 # No position - keep target
                 adjusted_targets.append(target)
                 continue
 
-            # Update position high water mark
+            # Update position high water mark (single dict probe)
             current_value = abs(holding.holdings_value)
-            if symbol not in self.position_high_marks:
-                self.position_high_marks[symbol] = current_value
-            elif current_value > self.position_high_marks[symbol]:
-                self.position_high_marks[symbol] = current_value
+            high_mark = self.position_high_marks.get(symbol)
+            if high_mark is None or current_value > high_mark:
+                high_mark = current_value
+                self.position_high_marks[symbol] = high_mark
 
             # Check stop loss
             avg_cost = holding.average_price
@@ -174,17 +201,17 @@ class MomentumRiskManagementModel(RiskManagementModel):
 
             # Hard stop loss
             if pnl_pct < -self.position_stop_loss:
-                algorithm.log(f"STOP LOSS: {symbol.value} at {pnl_pct:.2%}")
-                adjusted_targets.append(PortfolioTarget(symbol, 0))
+                if self._log_enabled:
+                    algorithm.log(f"STOP LOSS: {symbol.value} at {pnl_pct:.2%}")
+                adjusted_targets.append(self._zero_target(symbol))
                 continue
 
-            # Trailing stop
-            if symbol in self.position_high_marks:
-                high_mark = self.position_high_marks[symbol]
-                if current_value < high_mark * (1 - self.trailing_stop_pct):
+            # Trailing stop (high_mark is always set above)
+            if current_value < high_mark * (1 - self.trailing_stop_pct):
+                if self._log_enabled:
                     algorithm.log(f"TRAILING STOP: {symbol.value}")
-                    adjusted_targets.append(PortfolioTarget(symbol, 0))
-                    continue
+                adjusted_targets.append(self._zero_target(symbol))
+                continue
 
             # Position OK - keep target
             adjusted_targets.append(target)
@@ -194,40 +221,44 @@ class MomentumRiskManagementModel(RiskManagementModel):
     def _check_gross_exposure(
         self,
         algorithm: QCAlgorithm,
-        targets: List[PortfolioTarget],
         current_equity: float
-    ) -> List[PortfolioTarget]:
-        """Check and adjust for gross exposure limits"""
-
-        # Calculate current gross exposure
-        long_value = sum(
-            h.holdings_value for h in algorithm.portfolio.values()
-            if h.invested and h.quantity > 0
-        )
-        short_value = sum(
-            abs(h.holdings_value) for h in algorithm.portfolio.values()
-            if h.invested and h.quantity < 0
-        )
+    ) -> float:
+        """Scale factor that keeps gross exposure within its limit (1.0 if not breached)"""
+
+        # Calculate current gross exposure in a single pass over holdings
+        long_value = 0
+        short_value = 0
+        for h in algorithm.portfolio.values():
+            if not h.invested:
+                continue
+            # The sign of holdings value already encodes long/short
+            value = h.holdings_value
+            if value > 0:
+                long_value += value
+            elif value < 0:
+                short_value -= value
 
         gross_exposure = (long_value + short_value) / current_equity if current_equity > 0 else 0
 
         # If over limit, scale down targets
         if gross_exposure > self.max_gross_exposure:
             scale_factor = self.max_gross_exposure / gross_exposure
-            algorithm.log(f"Scaling positions by {scale_factor:.2f} for gross exposure")
+            if self._log_enabled:
+                algorithm.log(f"Scaling positions by {scale_factor:.2f} for gross exposure")
+            return scale_factor
 
-            targets = [
-                PortfolioTarget(t.symbol, t.quantity * scale_factor)
-                for t in targets
-            ]
+        return 1.0
 
-        return targets
+    def _scale_factor(self, algorithm: QCAlgorithm, today: date) -> float:
+        """Additional target scale applied with the gross exposure scale (override in subclasses)"""
+        return 1.0
 
-    def _enter_risk_off_mode(self, algorithm: QCAlgorithm, duration: timedelta):
+    def _enter_risk_off_mode(self, algorithm: QCAlgorithm, now: datetime, duration: timedelta):
         """Enter risk-off mode"""
         self.is_risk_off = True
-        self.risk_off_until = algorithm.time + duration
-        algorithm.log(f"Entering risk-off mode until {self.risk_off_until}")
+        self.risk_off_until = now + duration
+        if self._log_enabled:
+            algorithm.log(f"Entering risk-off mode until {self.risk_off_until}")
 
     def _liquidate_all(
         self,
@@ -236,27 +267,39 @@ class MomentumRiskManagementModel(RiskManagementModel):
         reason: str
     ) -> List[PortfolioTarget]:
         """Generate liquidation targets for all positions"""
-        algorithm.log(f"LIQUIDATING ALL: {reason}")
+        if self._log_enabled:
+            algorithm.log(f"LIQUIDATING ALL: {reason}")
 
         liquidation_targets = []
 
         # Liquidate all current positions
         for holding in algorithm.portfolio.values():
             if holding.invested:
-                liquidation_targets.append(PortfolioTarget(holding.symbol, 0))
+                liquidation_targets.append(self._zero_target(holding.symbol))
 
-        # Also set all incoming targets to 0
+        # Also set all incoming targets to 0 (once per symbol)
+        seen = {t.symbol for t in liquidation_targets}
         for target in targets:
-            if target.symbol not in [t.symbol for t in liquidation_targets]:
-                liquidation_targets.append(PortfolioTarget(target.symbol, 0))
+            if target.symbol not in seen:
+                seen.add(target.symbol)
+                liquidation_targets.append(self._zero_target(target.symbol))
 
         return liquidation_targets
 
+    def _zero_target(self, symbol: Symbol) -> PortfolioTarget:
+        """Cached zero-quantity target for a symbol (targets are immutable, so safe to reuse)"""
+        target = self._zero_targets.get(symbol)
+        if target is None:
+            target = PortfolioTarget(symbol, 0)
+            self._zero_targets[symbol] = target
+        return target
+
     def on_securities_changed(self, algorithm: QCAlgorithm, changes: SecurityChanges):
         """Clean up tracking for removed securities"""
         for security in changes.removed_securities:
             if security.symbol in self.position_high_marks:
                 del self.position_high_marks[security.symbol]
+            self._zero_targets.pop(security.symbol, None)
 
 
 class VolatilityScaledRiskModel(MomentumRiskManagementModel):
@@ -275,11 +318,13 @@ class VolatilityScaledRiskModel(MomentumRiskManagementModel):
         max_gross_exposure: float = 2.0,
         target_volatility: float = 0.15,
         vix_high_threshold: float = 30.0,
-        vix_extreme_threshold: float = 40.0
+        vix_extreme_threshold: float = 40.0,
+        log_enabled: bool = True
     ):
         super().__init__(
             max_drawdown_pct, daily_loss_limit,
-            position_stop_loss, max_gross_exposure
+            position_stop_loss, max_gross_exposure,
+            log_enabled=log_enabled
         )
 
         self.target_volatility = target_volatility
@@ -290,26 +335,15 @@ class VolatilityScaledRiskModel(MomentumRiskManagementModel):
         self.vix_symbol: Optional[Symbol] = None
         self.current_vix: float = 15.0  # Default
 
-    def manage_risk(
-        self,
-        algorithm: QCAlgorithm,
-        targets: List[PortfolioTarget]
-    ) -> List[PortfolioTarget]:
-        """Manage risk with volatility scaling"""
-
-        # Get base risk management
-        targets = super().manage_risk(algorithm, targets)
+        # Scale and regime for the last VIX reading (recomputed only when VIX changes)
+        self._last_vix: Optional[float] = None
+        self._last_scale: float = 1.0
+        self._last_regime: Optional[str] = None
 
-        # Apply volatility scaling
-        targets = self._apply_volatility_scaling(algorithm, targets)
-
-        return targets
+        # Volatility regime last logged and its date (log once per day per regime)
+        self._last_vol_log: Optional[tuple[date, str]] = None
 
-    def _apply_volatility_scaling(
-        self,
-        algorithm: QCAlgorithm,
-        targets: List[PortfolioTarget]
-    ) -> List[PortfolioTarget]:
+    def _scale_factor(self, algorithm: QCAlgorithm, today: date) -> float:
         """Scale positions based on VIX level"""
 
         # Try to get VIX value
@@ -318,26 +352,45 @@ class VolatilityScaledRiskModel(MomentumRiskManagementModel):
             if vix_security.price > 0:
                 self.current_vix = vix_security.price
 
-        # Calculate scaling factor
-        if self.current_vix >= self.vix_extreme_threshold:
-            # Extreme volatility - reduce to 25%
-            scale_factor = 0.25
-            algorithm.log(f"EXTREME VOL: VIX {self.current_vix:.1f} - scaling to 25%")
-        elif self.current_vix >= self.vix_high_threshold:
-            # High volatility - reduce to 50%
-            scale_factor = 0.50
-            algorithm.log(f"HIGH VOL: VIX {self.current_vix:.1f} - scaling to 50%")
-        else:
-            # Normal volatility
-            scale_factor = 1.0
+        # Calculate scaling factor (VIX typically changes once per day)
+        if self.current_vix != self._last_vix:
+            self._last_vix = self.current_vix
+            if self.current_vix >= self.vix_extreme_threshold:
+                # Extreme volatility - reduce to 25%
+                self._last_scale = 0.25
+                self._last_regime = "EXTREME VOL"
+            elif self.current_vix >= self.vix_high_threshold:
+                # High volatility - reduce to 50%
+                self._last_scale = 0.50
+                self._last_regime = "HIGH VOL"
+            else:
+                # Normal volatility
+                self._last_scale = 1.0
+                self._last_regime = None
 
+        scale_factor = self._last_scale
         if scale_factor < 1.0:
-            targets = [
-                PortfolioTarget(t.symbol, t.quantity * scale_factor)
-                for t in targets
-            ]
+            self._log_volatility_regime(algorithm, today, self._last_regime, scale_factor)
 
-        return targets
+        return scale_factor
+
+    def _log_volatility_regime(
+        self,
+        algorithm: QCAlgorithm,
+        today: date,
+        regime: str,
+        scale_factor: float
+    ):
+        """Log an elevated volatility regime at most once per day per regime"""
+        if not self._log_enabled:
+            return
+
+        key = (today, regime)
+        if key == self._last_vol_log:
+            return
+        self._last_vol_log = key
+
+        algorithm.log(f"{regime}: VIX {self.current_vix:.1f} - scaling to {scale_factor:.0%}")
 
 
 class SectorExposureRiskModel(RiskManagementModel):
@@ -348,13 +401,15 @@ class SectorExposureRiskModel(RiskManagementModel):
     Prevents concentration risk.
     """
 
-    def __init__(self, max_sector_exposure: float = 0.30):
+    def __init__(self, max_sector_exposure: float = 0.30, log_enabled: bool = True):
         """
         Args:
             max_sector_exposure: Maximum exposure to any sector (default 30%)
+            log_enabled: Emit sector limit logs (disable to skip message formatting)
         """
         super().__init__()
         self.max_sector_exposure = max_sector_exposure
+        self._log_enabled = log_enabled
         self.sector_by_symbol: Dict[Symbol, str] = {}
 
     def manage_risk(
@@ -364,33 +419,37 @@ class SectorExposureRiskModel(RiskManagementModel):
     ) -> List[PortfolioTarget]:
         """Manage sector exposure risk"""
 
+        # Resolve each target's sector once
+        sector_of: Dict[Symbol, Optional[str]] = {
+            t.symbol: self._get_sector(algorithm, t.symbol) for t in targets
+        }
+
         # Calculate sector exposures
         sector_exposure: Dict[str, float] = {}
 
         for target in targets:
-            symbol = target.symbol
-            sector = self._get_sector(algorithm, symbol)
+            sector = sector_of[target.symbol]
 
             if sector:
                 exposure = abs(target.quantity)
                 sector_exposure[sector] = sector_exposure.get(sector, 0) + exposure
 
-        # Check for over-exposed sectors
+        # Scale factors for over-exposed sectors
+        sector_scale: Dict[str, float] = {}
         for sector, exposure in sector_exposure.items():
             if exposure > self.max_sector_exposure:
-                # Scale down positions in this sector
-                scale_factor = self.max_sector_exposure / exposure
-                algorithm.log(f"SECTOR LIMIT: {sector} at {exposure:.1%}, "
-                            f"scaling to {self.max_sector_exposure:.0%}")
-
-                targets = [
-                    PortfolioTarget(
-                        t.symbol,
-                        t.quantity * scale_factor if self._get_sector(algorithm, t.symbol) == sector
-                        else t.quantity
-                    )
-                    for t in targets
-                ]
+                sector_scale[sector] = self.max_sector_exposure / exposure
+                if self._log_enabled:
+                    algorithm.log(f"SECTOR LIMIT: {sector} at {exposure:.1%}, "
+                                f"scaling to {self.max_sector_exposure:.0%}")
+
+        # Scale down positions in breached sectors in a single pass
+        if sector_scale:
+            targets = [
+                PortfolioTarget(t.symbol, t.quantity * sector_scale[sector_of[t.symbol]])
+                if sector_of[t.symbol] in sector_scale else t
+                for t in targets
+            ]
 
         return targets
 
@@ -0,0 +1,91 @@
+"""
+Parity tests for the Numba kernels and their NumPy fallbacks
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kernels
+
+
+def _sorted_long_short(values, n_long, n_short):
+    """Reference selection: head and tail of a stable descending sort"""
+    ranked = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+    return ranked[:n_long], ranked[len(ranked) - min(n_short, len(ranked)):]
+
+
+class SelectLongShortTests(unittest.TestCase):
+    def setUp(self):
+        # Few distinct values so boundary ties are common
+        rng = np.random.default_rng(0)
+        self.cases = []
+        for _ in range(2000):
+            n = int(rng.integers(0, 30))
+            values = rng.integers(-3, 4, n).astype(np.float64)
+            self.cases.append((values, int(rng.integers(0, 6)), int(rng.integers(0, 6))))
+
+    def _assert_matches_reference(self, select):
+        for values, n_long, n_short in self.cases:
+            long_idx, short_idx = select(values, n_long, n_short)
+            expected_long, expected_short = _sorted_long_short(values.tolist(), n_long, n_short)
+            self.assertEqual(expected_long, long_idx.tolist())
+            self.assertEqual(expected_short, short_idx.tolist())
+
+    def test_numpy_fallback_matches_sorted_reference(self):
+        self._assert_matches_reference(kernels._select_long_short_numpy)
+
+    @unittest.skipUnless(kernels.NUMBA_AVAILABLE, "numba not installed")
+    def test_numba_kernel_matches_sorted_reference(self):
+        self._assert_matches_reference(kernels._select_long_short_numba)
+
+    def test_tied_boundary_does_not_overlap_legs(self):
+        values = np.array([1, 2, 3, 4, 5, 5, 6, 7, 8, 9], dtype=np.float64)
+        long_idx, short_idx = kernels.select_long_short(values, 5, 5)
+        self.assertEqual([9, 8, 7, 6, 4], long_idx.tolist())
+        self.assertEqual([5, 3, 2, 1, 0], short_idx.tolist())
+
+
+@unittest.skipUnless(kernels.NUMBA_AVAILABLE, "numba not installed")
+class KernelParityTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(1)
+
+    def test_momentum_scores(self):
+        for _ in range(200):
+            n = int(self.rng.integers(0, 50))
+            current = self.rng.choice([0.0, 1.0, 10.0, 1e4, 50.0], n)
+            past = self.rng.choice([0.0, 1.0, 10.0, 20.0], n)
+            numba_momentum, numba_valid = kernels._momentum_scores_numba(current, past)
+            numpy_momentum, numpy_valid = kernels._momentum_scores_numpy(current, past)
+            np.testing.assert_array_equal(numpy_valid, numba_valid)
+            np.testing.assert_allclose(numpy_momentum[numpy_valid], numba_momentum[numba_valid])
+
+    def test_score_and_confidence(self):
+        for _ in range(200):
+            n = int(self.rng.integers(1, 50))
+            momentum = self.rng.normal(0, 20, n)
+            volatility = self.rng.choice([0.0, 0.5, 2.0], n)
+            numba_result = kernels._score_and_confidence_numba(momentum, volatility)
+            numpy_result = kernels._score_and_confidence_numpy(momentum, volatility)
+            np.testing.assert_allclose(numpy_result[0], numba_result[0])
+            np.testing.assert_allclose(numpy_result[1], numba_result[1], atol=1e-9)
+
+    def test_liquidity_order(self):
+        for _ in range(200):
+            n = int(self.rng.integers(0, 200))
+            has_data = (self.rng.random(n) < 0.9).astype(np.float64)
+            prices = self.rng.choice([1.0, 5.0, np.nan, 20.0], n)
+            dollar_volumes = self.rng.choice([5e5, 1e6, 2e6, np.nan, 3e6], n)
+            np.testing.assert_array_equal(
+                kernels._liquidity_order_numpy(has_data, prices, dollar_volumes, 5.0, 1e6),
+                kernels._liquidity_order_numba(has_data, prices, dollar_volumes, 5.0, 1e6)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,93 @@ Filters for liquid, tradable US equities.
 """
 
 from AlgorithmImports import *
-from typing import List, Set
+from typing import List, FrozenSet
 from datetime import datetime
+from heapq import nlargest
+from operator import attrgetter
+import numpy as np
+
+from kernels import liquidity_order
+
+# Leveraged/inverse ETF exclusion list, built once at import
+_EXCLUDED_LEVERAGED_ETFS: FrozenSet[str] = frozenset({
+    # 3x Leveraged Long
+    'TQQQ', 'TECL', 'SOXL', 'UPRO', 'SPXL', 'TNA', 'UDOW', 'LABU',
+    'NUGT', 'FNGU', 'BULZ', 'NAIL', 'DPST', 'DFEN', 'MIDU', 'UMDD',
+    'URTY', 'FAS', 'ERX', 'CURE', 'PILL', 'RETL', 'HIBL', 'WEBL',
+    'WANT', 'DUSL', 'MEXX', 'UTSL', 'DRN',
+
+    # 3x Leveraged Short
+    'SQQQ', 'TECS', 'SOXS', 'SPXU', 'SPXS', 'TZA', 'SDOW', 'LABD',
+    'DUST', 'FNGD', 'BERZ', 'WEBS', 'HIBS', 'FAZ', 'ERY', 'DRIP',
+    'YANG', 'EDZ', 'DRV', 'SRTY', 'MIDZ', 'SMDD',
+
+    # 2x Leveraged
+    'QLD', 'SSO', 'DDM', 'UWM', 'MVV', 'SAA', 'ROM', 'UGE', 'UYG',
+    'UCC', 'USD', 'UPW', 'UXI', 'UYM', 'DIG', 'UGL', 'AGQ', 'UCO',
+    'BOIL', 'UBT', 'UST', 'BIB', 'CWEB',
+
+    # 2x Inverse
+    'QID', 'SDS', 'DXD', 'TWM', 'MZZ', 'SDD', 'REW', 'SZK', 'SKF',
+    'SCC', 'SDP', 'SIJ', 'SMN', 'DUG', 'GLL', 'ZSL', 'SCO', 'KOLD',
+    'TBT', 'TBZ', 'PST', 'BIS',
+
+    # 1x Inverse
+    'SH', 'PSQ', 'DOG', 'RWM', 'MYY', 'SEF', 'EUM', 'EFZ',
+
+    # Volatility Products
+    'VXX', 'UVXY', 'SVXY', 'VIXY', 'VIXM', 'VXZ', 'UVIX', 'SVIX',
+    'TVIX', 'ZIV', 'VXF',
+
+    # Commodity ETFs
+    'USO', 'UNG', 'GLD', 'SLV', 'CORN', 'WEAT', 'SOYB', 'DBA',
+    'DBB', 'DBC', 'DBO', 'DBP', 'DBS', 'GSG', 'PDBC', 'USCI',
+    'COMT', 'BCI', 'FTGC', 'COM', 'RJI', 'RJA', 'RJN', 'RJZ',
+    'JJC', 'JJN', 'JJU', 'JJM', 'JJG', 'JJA', 'JJE', 'JJT',
+    'UGA', 'BNO', 'OIL', 'DJP', 'GAZ', 'ONG',
+
+    # Other excluded (ADRs, CEFs, etc. that could cause issues)
+    'JNUG', 'JDST', 'GUSH', 'OILU', 'OILD', 'GASL', 'GASX',
+    'YINN', 'YANG', 'INDL', 'EDC', 'LBJ', 'EURL', 'EZJ',
+    'RUSL', 'RUSS', 'BRZU', 'BRAZ'
+})
+
+# EU-compliant stock list (verified for IBKR EU accounts), built once at import
+_EU_COMPLIANT_SYMBOLS: FrozenSet[str] = frozenset({
+    'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'NVDA', 'META', 'TSLA',
+    'BRK.B', 'UNH', 'JNJ', 'V', 'XOM', 'JPM', 'MA', 'PG', 'HD', 'CVX',
+    'MRK', 'ABBV', 'LLY', 'PEP', 'KO', 'COST', 'AVGO', 'TMO', 'MCD',
+    'WMT', 'CSCO', 'ACN', 'ABT', 'DHR', 'CRM', 'LIN', 'NKE', 'ADBE',
+    'TXN', 'VZ', 'PM', 'NEE', 'CMCSA', 'UPS', 'RTX', 'ORCL', 'HON',
+    'BMY', 'AMGN', 'LOW', 'QCOM', 'UNP', 'IBM', 'SPGI', 'GE', 'SBUX',
+    'CAT', 'BA', 'INTC', 'INTU', 'AMD', 'PLD', 'MDLZ', 'DE', 'GILD',
+    'ADI', 'AXP', 'TJX', 'BLK', 'AMAT', 'ISRG', 'BKNG', 'VRTX', 'SYK',
+    'MMC', 'REGN', 'CVS', 'ADP', 'MO', 'CI', 'LRCX', 'ZTS', 'PGR',
+    'CB', 'SCHW', 'CME', 'TMUS', 'NOW', 'SO', 'FIS', 'DUK', 'EOG',
+    'BDX', 'CL', 'ITW', 'NOC', 'SLB', 'CSX', 'MMM', 'MU', 'ICE',
+    'APD', 'KLAC', 'SHW', 'AON', 'SNPS', 'FDX', 'NSC', 'CCI', 'WM',
+    'PNC', 'CDNS', 'TGT', 'ORLY', 'MCK', 'MAR', 'EMR', 'ATVI', 'USB',
+    'EL', 'GD', 'PSA', 'NXPI', 'ADM', 'AZO', 'MCHP', 'HUM', 'MPC',
+    'AEP', 'D', 'DG', 'FTNT', 'APH', 'MNST', 'PAYX', 'SRE', 'KMB',
+    'ECL', 'DXCM', 'JCI', 'CTAS', 'VLO', 'NEM', 'GIS', 'A', 'MSCI',
+    'F', 'PSX', 'TEL', 'CARR', 'ROST', 'ILMN', 'KMI', 'O', 'CMG',
+    'HSY', 'WELL', 'KDP', 'XEL', 'ANET', 'PCAR', 'DLTR', 'EA', 'KHC',
+    'BIIB', 'WMB', 'PH', 'CTSH', 'AIG', 'MSI', 'LHX', 'IDXX', 'TRV',
+    'DD', 'EXC', 'ED', 'YUM', 'STZ', 'GPN', 'IQV', 'ALB', 'KEYS',
+    'FAST', 'CPRT', 'VRSK', 'ODFL', 'AWK', 'ON', 'PPG', 'RMD', 'ROK',
+    'AME', 'DOW', 'BKR', 'WEC', 'DLR', 'HES', 'CBRE', 'OKE', 'SBAC',
+    'DVN', 'CDW', 'MTD', 'WBD', 'EIX', 'HPQ', 'GLW', 'EFX', 'ANSS',
+    'ZBH', 'HAL', 'FANG', 'EBAY', 'ENPH', 'GWW', 'EXR', 'FTV', 'NUE'
+})
+
+# Ranking and extraction keys (attrgetter runs the attribute fetch in C)
+_dollar_volume_key = attrgetter('dollar_volume')
+_symbol_key = attrgetter('symbol')
+
+
+def _market_cap_key(stock: FineFundamental) -> float:
+    """Market cap ranking key (missing market cap ranks as 0)"""
+    return stock.market_cap if stock.market_cap else 0
 
 
 class MomentumUniverseSelectionModel(FundamentalUniverseSelectionModel):
@@ -50,50 +135,11 @@ class MomentumUniverseSelectionModel(FundamentalUniverseSelectionModel):
         self.min_dollar_volume = min_dollar_volume
         self.min_market_cap = min_market_cap
         self.exclude_sectors = exclude_sectors or []
+        self._exclude_sectors_set: FrozenSet[int] = frozenset(self.exclude_sectors)
         self.exclude_leveraged = exclude_leveraged
 
-        # Leveraged/inverse ETF exclusion list
-        self.excluded_symbols: Set[str] = {
-            # 3x Leveraged Long
-            'TQQQ', 'TECL', 'SOXL', 'UPRO', 'SPXL', 'TNA', 'UDOW', 'LABU',
-            'NUGT', 'FNGU', 'BULZ', 'NAIL', 'DPST', 'DFEN', 'MIDU', 'UMDD',
-            'URTY', 'FAS', 'ERX', 'CURE', 'PILL', 'RETL', 'HIBL', 'WEBL',
-            'WANT', 'DUSL', 'MEXX', 'UTSL', 'DRN',
-
-            # 3x Leveraged Short
-            'SQQQ', 'TECS', 'SOXS', 'SPXU', 'SPXS', 'TZA', 'SDOW', 'LABD',
-            'DUST', 'FNGD', 'BERZ', 'WEBS', 'HIBS', 'FAZ', 'ERY', 'DRIP',
-            'YANG', 'EDZ', 'DRV', 'SRTY', 'MIDZ', 'SMDD',
-
-            # 2x Leveraged
-            'QLD', 'SSO', 'DDM', 'UWM', 'MVV', 'SAA', 'ROM', 'UGE', 'UYG',
-            'UCC', 'USD', 'UPW', 'UXI', 'UYM', 'DIG', 'UGL', 'AGQ', 'UCO',
-            'BOIL', 'UBT', 'UST', 'BIB', 'CWEB',
-
-            # 2x Inverse
-            'QID', 'SDS', 'DXD', 'TWM', 'MZZ', 'SDD', 'REW', 'SZK', 'SKF',
-            'SCC', 'SDP', 'SIJ', 'SMN', 'DUG', 'GLL', 'ZSL', 'SCO', 'KOLD',
-            'TBT', 'TBZ', 'PST', 'BIS',
-
-            # 1x Inverse
-            'SH', 'PSQ', 'DOG', 'RWM', 'MYY', 'SEF', 'EUM', 'EFZ',
-
-            # Volatility Products
-            'VXX', 'UVXY', 'SVXY', 'VIXY', 'VIXM', 'VXZ', 'UVIX', 'SVIX',
-            'TVIX', 'ZIV', 'VXF',
-
-            # Commodity ETFs
-            'USO', 'UNG', 'GLD', 'SLV', 'CORN', 'WEAT', 'SOYB', 'DBA',
-            'DBB', 'DBC', 'DBO', 'DBP', 'DBS', 'GSG', 'PDBC', 'USCI',
-            'COMT', 'BCI', 'FTGC', 'COM', 'RJI', 'RJA', 'RJN', 'RJZ',
-            'JJC', 'JJN', 'JJU', 'JJM', 'JJG', 'JJA', 'JJE', 'JJT',
-            'UGA', 'BNO', 'OIL', 'DJP', 'GAZ', 'ONG',
-
-            # Other excluded (ADRs, CEFs, etc. that could cause issues)
-            'JNUG', 'JDST', 'GUSH', 'OILU', 'OILD', 'GASL', 'GASX',
-            'YINN', 'YANG', 'INDL', 'EDC', 'LBJ', 'EURL', 'EZJ',
-            'RUSL', 'RUSS', 'BRZU', 'BRAZ'
-        }
+        # Leveraged/inverse ETF exclusion list (shared immutable set)
+        self.excluded_symbols: FrozenSet[str] = _EXCLUDED_LEVERAGED_ETFS
 
     def select(self, algorithm: QCAlgorithm, fundamental: List[Fundamental]) -> List[Symbol]:
         """
@@ -106,50 +152,55 @@ class MomentumUniverseSelectionModel(FundamentalUniverseSelectionModel):
         Returns:
             List of selected symbols
         """
-        filtered = []
-        
-        for stock in fundamental:
-            # Must have fundamental data
-            if not stock.has_fundamental_data:
-                continue
-                
-            # Price filter
-            if stock.price < self.min_price:
-                continue
-                
-            # Dollar volume filter
-            if stock.dollar_volume < self.min_dollar_volume:
-                continue
-                
-            # Market cap filter (if available)
-            if hasattr(stock, 'market_cap') and stock.market_cap:
-                if stock.market_cap < self.min_market_cap:
-                    continue
-                    
-            # Sector exclusions
-            if hasattr(stock, 'asset_classification'):
-                sector = stock.asset_classification.morningstar_sector_code
-                if sector in self.exclude_sectors:
-                    continue
-                    
-            # Exclude leveraged/inverse ETFs
-            if self.exclude_leveraged:
-                if stock.symbol.value in self.excluded_symbols:
-                    continue
-                    
-            filtered.append(stock)
-            
-        # Sort by dollar volume
-        sorted_stocks = sorted(filtered, key=lambda x: x.dollar_volume, reverse=True)
-        
-        # Return top symbols
-        selected = [x.symbol for x in sorted_stocks[:self.universe_size]]
+        stocks = list(fundamental)
+
+        # Fundamental data, price and dollar volume screens in one vectorized pass
+        screens = np.array(
+            [(stock.has_fundamental_data, stock.price, stock.dollar_volume) for stock in stocks],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        has_data, prices, dollar_volumes = screens.T
+
+        # Most liquid first (stable, so ties keep input order)
+        candidates = liquidity_order(
+            has_data, prices, dollar_volumes, self.min_price, self.min_dollar_volume
+        )
+
+        # Remaining screens need more per-stock lookups: apply them in liquidity
+        # order and stop as soon as the universe is full
+        selected: List[Symbol] = []
+        for i in candidates.tolist():
+            if len(selected) >= self.universe_size:
+                break
+            stock = stocks[i]
+            if self._passes_fundamental_screens(stock):
+                selected.append(stock.symbol)
         
         if selected:
             algorithm.log(f"MomentumUniverse: Selected {len(selected)} securities")
             
         return selected
 
+    def _passes_fundamental_screens(self, stock: Fundamental) -> bool:
+        """Market cap, sector and leveraged/inverse ETF screens for a single stock"""
+        # Market cap filter (if available)
+        if hasattr(stock, 'market_cap') and stock.market_cap:
+            if stock.market_cap < self.min_market_cap:
+                return False
+
+        # Sector exclusions
+        if hasattr(stock, 'asset_classification'):
+            sector = stock.asset_classification.morningstar_sector_code
+            if sector in self._exclude_sectors_set:
+                return False
+
+        # Exclude leveraged/inverse ETFs
+        if self.exclude_leveraged:
+            if stock.symbol.value in self.excluded_symbols:
+                return False
+
+        return True
+
     def select_coarse(self, algorithm: QCAlgorithm, coarse: List[Fundamental]) -> List[Symbol]:
         """
         First pass filter: liquidity and basic criteria
@@ -183,11 +234,8 @@ class MomentumUniverseSelectionModel(FundamentalUniverseSelectionModel):
 
             filtered.append(stock)
 
-        # Sort by dollar volume (most liquid first)
-        sorted_stocks = sorted(filtered, key=lambda x: x.dollar_volume, reverse=True)
-
-        # Return symbols for fine filter
-        return [x.symbol for x in sorted_stocks[:self.universe_size * 2]]
+        # Return the most liquid symbols for fine filter (partial heap selection, no full sort)
+        return [x.symbol for x in nlargest(self.universe_size * 2, filtered, key=_dollar_volume_key)]
 
     def select_fine(self, algorithm: QCAlgorithm, fine: List[FineFundamental]) -> List[Symbol]:
         """
@@ -209,7 +257,7 @@ class MomentumUniverseSelectionModel(FundamentalUniverseSelectionModel):
 
             # Sector exclusions
             sector = stock.asset_classification.morningstar_sector_code
-            if sector in self.exclude_sectors:
+            if sector in self._exclude_sectors_set:
                 continue
 
             # Additional quality filters (optional)
@@ -221,15 +269,8 @@ class MomentumUniverseSelectionModel(FundamentalUniverseSelectionModel):
 
             filtered.append(stock)
 
-        # Sort by market cap
-        sorted_stocks = sorted(
-            filtered,
-            key=lambda x: x.market_cap if x.market_cap else 0,
-            reverse=True
-        )
-
-        # Return top N symbols
-        selected = [x.symbol for x in sorted_stocks[:self.universe_size]]
+        # Return top N symbols by market cap
+        selected = [x.symbol for x in nlargest(self.universe_size, filtered, key=_market_cap_key)]
 
         algorithm.log(f"Universe: {len(selected)} securities selected")
 
@@ -289,19 +330,13 @@ class SmallCapMomentumUniverse(MomentumUniverseSelectionModel):
 
             # Exclude sectors
             sector = stock.asset_classification.morningstar_sector_code
-            if sector in self.exclude_sectors:
+            if sector in self._exclude_sectors_set:
                 continue
 
             filtered.append(stock)
 
-        # Sort by momentum potential (could use other metrics)
-        sorted_stocks = sorted(
-            filtered,
-            key=lambda x: x.market_cap if x.market_cap else 0,
-            reverse=True
-        )
-
-        return [x.symbol for x in sorted_stocks[:self.universe_size]]
+        # Rank by momentum potential (could use other metrics)
+        return [x.symbol for x in nlargest(self.universe_size, filtered, key=_market_cap_key)]
 
 
 class EUCompliantUniverse(MomentumUniverseSelectionModel):
@@ -313,32 +348,7 @@ class EUCompliantUniverse(MomentumUniverseSelectionModel):
     """
 
     # EU-compliant stock list (verified for IBKR EU accounts)
-    EU_COMPLIANT_SYMBOLS = {
-        'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'NVDA', 'META', 'TSLA',
-        'BRK.B', 'UNH', 'JNJ', 'V', 'XOM', 'JPM', 'MA', 'PG', 'HD', 'CVX',
-        'MRK', 'ABBV', 'LLY', 'PEP', 'KO', 'COST', 'AVGO', 'TMO', 'MCD',
-        'WMT', 'CSCO', 'ACN', 'ABT', 'DHR', 'CRM', 'LIN', 'NKE', 'ADBE',
-        'TXN', 'VZ', 'PM', 'NEE', 'CMCSA', 'UPS', 'RTX', 'ORCL', 'HON',
-        'BMY', 'AMGN', 'LOW', 'QCOM', 'UNP', 'IBM', 'SPGI', 'GE', 'SBUX',
-        'CAT', 'BA', 'INTC', 'INTU', 'AMD', 'PLD', 'MDLZ', 'DE', 'GILD',
-        'ADI', 'AXP', 'TJX', 'BLK', 'AMAT', 'ISRG', 'BKNG', 'VRTX', 'SYK',
-        'MMC', 'REGN', 'CVS', 'ADP', 'MO', 'CI', 'LRCX', 'ZTS', 'PGR',
-        'CB', 'SCHW', 'CME', 'TMUS', 'NOW', 'SO', 'FIS', 'DUK', 'EOG',
-        'BDX', 'CL', 'ITW', 'NOC', 'SLB', 'CSX', 'MMM', 'MU', 'ICE',
-        'APD', 'KLAC', 'SHW', 'AON', 'SNPS', 'FDX', 'NSC', 'CCI', 'WM',
-        'PNC', 'CDNS', 'TGT', 'ORLY', 'MCK', 'MAR', 'EMR', 'ATVI', 'USB',
-        'EL', 'GD', 'PSA', 'NXPI', 'ADM', 'AZO', 'MCHP', 'HUM', 'MPC',
-        'AEP', 'D', 'DG', 'FTNT', 'APH', 'MNST', 'PAYX', 'SRE', 'KMB',
-        'ECL', 'DXCM', 'JCI', 'CTAS', 'VLO', 'NEM', 'GIS', 'A', 'MSCI',
-        'F', 'PSX', 'TEL', 'CARR', 'ROST', 'ILMN', 'KMI', 'O', 'CMG',
-        'HSY', 'WELL', 'KDP', 'XEL', 'ANET', 'PCAR', 'DLTR', 'EA', 'KHC',
-        'BIIB', 'WMB', 'PH', 'CTSH', 'AIG', 'MSI', 'LHX', 'IDXX', 'TRV',
-        'DD', 'EXC', 'ED', 'YUM', 'STZ', 'GPN', 'IQV', 'ALB', 'KEYS',
-        'FAST', 'CPRT', 'VRSK', 'ODFL', 'AWK', 'ON', 'PPG', 'RMD', 'ROK',
-        'AME', 'DOW', 'BKR', 'WEC', 'DLR', 'HES', 'CBRE', 'OKE', 'SBAC',
-        'DVN', 'CDW', 'MTD', 'WBD', 'EIX', 'HPQ', 'GLW', 'EFX', 'ANSS',
-        'ZBH', 'HAL', 'FANG', 'EBAY', 'ENPH', 'GWW', 'EXR', 'FTV', 'NUE'
-    }
+    EU_COMPLIANT_SYMBOLS: FrozenSet[str] = _EU_COMPLIANT_SYMBOLS
 
     def __init__(self):
         super().__init__(
@@ -368,10 +378,10 @@ class EUCompliantUniverse(MomentumUniverseSelectionModel):
             filtered.append(stock)
 
         # Sort by dollar volume
-        sorted_stocks = sorted(filtered, key=lambda x: x.dollar_volume, reverse=True)
+        sorted_stocks = sorted(filtered, key=_dollar_volume_key, reverse=True)
 
         return [x.symbol for x in sorted_stocks]
 
     def select_fine(self, algorithm: QCAlgorithm, fine: List[FineFundamental]) -> List[Symbol]:
         """No additional filtering needed for EU-compliant list"""
-        return [x.symbol for x in fine]
+        return list(map(_symbol_key, fine))